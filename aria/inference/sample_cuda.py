@@ -1,5 +1,6 @@
 """Contains generation/sampling code"""
 
+import numpy as np
 import torch
 import torch._inductor.config
 
@@ -60,25 +61,37 @@ def update_seq_ids_(
     force_end: bool,
     tokenizer: Tokenizer,
 ):
+    # Single device->host sync per step; the bookkeeping below is plain Python
+    # so the GIL is only held for cheap list operations
+    next_ids = next_token_ids.tolist()
+    pad_id = tokenizer.tok_to_id[tokenizer.pad_tok]
+    dim_id = tokenizer.tok_to_id[tokenizer.dim_tok]
+    eos_id = tokenizer.tok_to_id[tokenizer.eos_tok]
+    modified = False
+
     # Insert dim and pad toks
-    for _idx in range(seq.shape[0]):
+    for _idx in range(len(next_ids)):
         if eos_tok_seen[_idx] == True:
-            next_token_ids[_idx] = tokenizer.tok_to_id[tokenizer.pad_tok]
+            next_ids[_idx] = pad_id
+            modified = True
         elif (
             force_end
             and idx >= max_len - 130
             and dim_tok_inserted[_idx] is False
-            and tokenizer.id_to_tok[next_token_ids[_idx].item()][0]
-            not in ("dur", "onset")
+            and tokenizer.id_to_tok[next_ids[_idx]][0] not in ("dur", "onset")
         ):
-            next_token_ids[_idx] = tokenizer.tok_to_id[tokenizer.dim_tok]
+            next_ids[_idx] = dim_id
+            modified = True
 
         # Update dim_tok_inserted and eos_tok_seen
-        if next_token_ids[_idx] == tokenizer.tok_to_id[tokenizer.dim_tok]:
+        if next_ids[_idx] == dim_id:
             dim_tok_inserted[_idx] = True
-        elif next_token_ids[_idx] == tokenizer.tok_to_id[tokenizer.eos_tok]:
+        elif next_ids[_idx] == eos_id:
             eos_tok_seen[_idx] = True
 
+    if modified:
+        next_token_ids = torch.tensor(next_ids, device=seq.device)
+
     seq[:, idx] = next_token_ids
 
 
@@ -350,3 +363,279 @@ def sample_batch_cfg(
     ]
 
     return decoded_results
+
+
+class CUDAGraphDecoder:
+    """Single-token decode step (forward + top-p sampling) as a CUDA graph.
+
+    The KV cache is allocated once with a fixed batch size and max_seq_len so
+    every decode step has static shapes. The step is captured once and then
+    replayed per token, replacing the per-kernel launches of the eager loop.
+    temp and top_p are capture-time constants.
+
+    With batch_size > 1 the batch holds independent candidate continuations
+    of the same prompt; decoding is memory-bound, so extra rows are nearly
+    free. generate() returns them ranked by mean token log-probability.
+    Log-probs are only computed when there is more than one candidate to rank.
+
+    Sequence, log-prob and pinned host staging buffers are also allocated
+    up front, so generate() does not go through the CUDA allocator.
+
+    The KV cache persists across calls. _cached_ids records the prompt
+    tokens resident in it (identical for every row), so a prompt that
+    extends an earlier one only prefills its new suffix. prefill() lets
+    callers extend the cache speculatively while input is still arriving.
+
+    compile runs the decode step through torch.compile (static shapes,
+    without Inductor's own cudagraphs) before capture, so the graph replays
+    fused kernels. Compilation happens during warmup, at construction time.
+    """
+
+    def __init__(
+        self,
+        model: TransformerLM,
+        batch_size: int,
+        max_seq_len: int,
+        temp: float,
+        top_p: float,
+        compile: bool = False,
+    ):
+        assert 0.0 <= temp <= 2.0
+        assert 0.5 <= top_p <= 1.0
+
+        self.model = model.cuda()
+        self.model.eval()
+        self.batch_size = batch_size
+        self.max_seq_len = max_seq_len
+        self.temp = temp
+        self.top_p = top_p
+        self._rank = batch_size > 1  # Record log-probs to rank candidates
+        self._step_forward = self._forward
+        if compile is True:
+            self._step_forward = torch.compile(
+                self._forward,
+                mode="max-autotune-no-cudagraphs",
+                dynamic=False,
+                fullgraph=True,
+            )
+
+        with torch.inference_mode():
+            model.setup_cache(
+                batch_size=batch_size,
+                max_seq_len=max_seq_len,
+                dtype=DTYPE,
+            )
+            # sample_batch() replaces the caches on the model, so keep our own
+            # references and reinstall them before replaying the graph
+            self._kv_caches = [b.kv_cache for b in model.model.encode_layers]
+            self._freqs_cis = model.model.freqs_cis
+            self._causal_mask = model.model.causal_mask
+
+            self.idxs = torch.zeros(
+                (batch_size, 1), dtype=torch.long, device="cuda"
+            )
+            self.input_pos = torch.zeros((1,), dtype=torch.int, device="cuda")
+
+            self.seq_buf = torch.empty(
+                (batch_size, max_seq_len), dtype=torch.long, device="cuda"
+            )
+            self.logprobs_buf = (
+                torch.zeros((batch_size, max_seq_len), device="cuda")
+                if self._rank
+                else None
+            )
+            self.positions = torch.arange(max_seq_len, device="cuda")
+            self.host_buf = torch.empty(
+                (max_seq_len,), dtype=torch.long, pin_memory=True
+            )
+            self._cached_ids = np.empty((0,), dtype=np.int64)
+
+            # Warmup on a side stream is required before capture
+            stream = torch.cuda.Stream()
+            stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(stream):
+                for _ in range(3):
+                    self._step()
+            torch.cuda.current_stream().wait_stream(stream)
+
+            self.graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(self.graph):
+                self.next_token_ids, self.next_token_logprobs = self._step()
+
+    def _install_cache(self):
+        for layer, kv_cache in zip(
+            self.model.model.encode_layers, self._kv_caches
+        ):
+            layer.kv_cache = kv_cache
+        self.model.model.freqs_cis = self._freqs_cis
+        self.model.model.causal_mask = self._causal_mask
+
+    def _forward(self, idxs: torch.Tensor, input_pos: torch.Tensor):
+        with torch.autocast("cuda", dtype=DTYPE):
+            with torch.nn.attention.sdpa_kernel(
+                torch.nn.attention.SDPBackend.MATH
+            ):
+                return self.model.forward(idxs=idxs, input_pos=input_pos)[:, -1]
+
+    def _sample(self, logits: torch.Tensor):
+        logits = logits.float()
+        if self.temp == 0.0:
+            next_token = torch.argmax(logits, dim=-1)
+        else:
+            next_token = self._sample_top_p(logits)
+        if not self._rank:
+            return next_token, None
+
+        logprobs = torch.log_softmax(logits, dim=-1)
+        next_logprob = torch.gather(logprobs, -1, next_token[:, None])
+
+        return next_token, next_logprob.flatten()
+
+    def _sample_top_p(self, logits: torch.Tensor) -> torch.Tensor:
+        probs = torch.softmax(logits / self.temp, dim=-1)
+        probs_sort, probs_idx = torch.sort(probs, dim=-1, descending=True)
+        probs_sum = torch.cumsum(probs_sort, dim=-1)
+        probs_sort.masked_fill_(probs_sum - probs_sort > self.top_p, 0.0)
+
+        # Exponential race: same distribution as torch.multinomial but
+        # without a host sync, so it can live inside the graph
+        noise = torch.empty_like(probs_sort).exponential_(1)
+        next_token = torch.argmax(probs_sort / noise, dim=-1, keepdim=True)
+
+        return torch.gather(probs_idx, -1, next_token).flatten()
+
+    def _cached_prefix_len(self, ids: np.ndarray) -> int:
+        n = min(len(self._cached_ids), len(ids))
+        mismatch = np.flatnonzero(self._cached_ids[:n] != ids[:n])
+        return int(mismatch[0]) if len(mismatch) else n
+
+    def _stage(self, ids: np.ndarray, total_len: int, pad_id: int):
+        # Stage through pinned memory into the preallocated sequence buffer,
+        # padding with a vector fill rather than encoding pad tokens one by
+        # one. Every caller syncs before returning, so host_buf is reusable.
+        host = self.host_buf[:total_len]
+        host_np = host.numpy()
+        host_np[: len(ids)] = ids
+        host_np[len(ids) :] = pad_id
+        seq = self.seq_buf[:, :total_len]
+        seq.copy_(host.expand(self.batch_size, -1), non_blocking=True)
+        return seq
+
+    @torch.inference_mode()
+    def prefill(self, tokenizer: Tokenizer, prompt: list) -> int:
+        """Extend the KV cache with prompt, without sampling.
+
+        Returns the number of tokens actually run through the model.
+        """
+        ids = np.asarray(tokenizer.encode(prompt), dtype=np.int64)
+        if len(ids) > self.max_seq_len:
+            return 0
+
+        start = self._cached_prefix_len(ids)
+        if start == len(ids):
+            return 0
+
+        self._install_cache()
+        seq = self._stage(ids, len(ids), 0)
+        self._forward(
+            idxs=seq[:, start:],
+            input_pos=self.positions[start : len(ids)],
+        )
+        torch.cuda.current_stream().synchronize()
+        self._cached_ids = ids
+
+        return len(ids) - start
+
+    def _step(self):
+        return self._sample(self._step_forward(self.idxs, self.input_pos))
+
+    @torch.inference_mode()
+    def generate(
+        self,
+        tokenizer: Tokenizer,
+        prompt: list,
+        max_new_tokens: int,
+        force_end: bool = False,
+    ):
+        prompt_len = len(prompt)
+        total_len = prompt_len + max_new_tokens
+        assert total_len <= self.max_seq_len, "sequence exceeds graph cache"
+        if force_end:
+            assert max_new_tokens > 130, "prompt too long to use force_end=True"
+
+        self._install_cache()
+        dim_tok_inserted = [False for _ in range(self.batch_size)]
+        eos_tok_seen = [False for _ in range(self.batch_size)]
+
+        ids = np.asarray(tokenizer.encode(prompt), dtype=np.int64)
+        pad_id = tokenizer.tok_to_id[tokenizer.pad_tok]
+        seq = self._stage(ids, total_len, pad_id)
+        if self._rank:
+            logprobs = self.logprobs_buf[:, :max_new_tokens].zero_()
+
+        # Prefill is variable-length, so it runs eagerly. Only the part of
+        # the prompt not already in the cache is run; the last prompt token
+        # always is, since its logits seed sampling.
+        start = min(self._cached_prefix_len(ids), prompt_len - 1)
+        logits = self._forward(
+            idxs=seq[:, start:prompt_len],
+            input_pos=self.positions[start:prompt_len],
+        )
+        # Positions past the prompt are overwritten with per-row samples
+        self._cached_ids = ids
+        next_token_ids, next_logprobs = self._sample(logits)
+        if self._rank:
+            logprobs[:, 0] = next_logprobs
+        update_seq_ids_(
+            seq=seq,
+            idx=prompt_len,
+            next_token_ids=next_token_ids,
+            dim_tok_inserted=dim_tok_inserted,
+            eos_tok_seen=eos_tok_seen,
+            max_len=total_len,
+            force_end=force_end,
+            tokenizer=tokenizer,
+        )
+
+        for idx in range(prompt_len + 1, total_len):
+            if all(seen_eos is True for seen_eos in eos_tok_seen):
+                break
+
+            self.idxs.copy_(seq[:, idx - 1 : idx])
+            self.input_pos.fill_(idx - 1)
+            self.graph.replay()
+            if self._rank:
+                logprobs[:, idx - prompt_len].copy_(self.next_token_logprobs)
+
+            update_seq_ids_(
+                seq=seq,
+                idx=idx,
+                next_token_ids=self.next_token_ids,
+                dim_tok_inserted=dim_tok_inserted,
+                eos_tok_seen=eos_tok_seen,
+                max_len=total_len,
+                force_end=force_end,
+                tokenizer=tokenizer,
+            )
+
+        if self._rank:
+            # Rank candidates by mean log-prob of the tokens they kept
+            valid = (
+                seq[:, prompt_len:] != tokenizer.tok_to_id[tokenizer.pad_tok]
+            )
+            scores = (logprobs * valid).sum(dim=-1) / valid.sum(dim=-1).clamp(
+                min=1
+            )
+            seq = seq[torch.argsort(scores, descending=True)]
+
+        decoded_results = [tokenizer.decode(s) for s in seq.tolist()]
+        decoded_results = [
+            (
+                res[: res.index(tokenizer.eos_tok) + 1]
+                if tokenizer.eos_tok in res
+                else res
+            )
+            for res in decoded_results
+        ]
+
+        return decoded_results
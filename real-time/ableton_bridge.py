@@ -18,9 +18,13 @@ Options:
     --temperature           Sampling temperature (default: 0.9)
     --top_p                 Top-p sampling (default: 0.95)
     --device                cuda or cpu (default: cuda)
+
+Environment:
+    ARIA_SKIP_CUDA_CHECK=1  Skip the startup CUDA availability probe
 """
 
 import argparse
+import dataclasses
 import logging
 import math
 import os
@@ -37,6 +41,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Directories searched for "<hint>.safetensors", resolved once at import
+CHECKPOINT_DIRS = (
+    Path("models"),
+    Path(__file__).parent.parent / "models",
+)
+
 
 def find_checkpoint(checkpoint_hint: str = "aria-medium-gen") -> str:
     """
@@ -46,10 +56,7 @@ def find_checkpoint(checkpoint_hint: str = "aria-medium-gen") -> str:
         return checkpoint_hint
 
     # Try in models/ folder
-    default_paths = [
-        Path("models") / f"{checkpoint_hint}.safetensors",
-        Path(__file__).parent.parent / "models" / f"{checkpoint_hint}.safetensors",
-    ]
+    default_paths = [d / f"{checkpoint_hint}.safetensors" for d in CHECKPOINT_DIRS]
 
     for p in default_paths:
         if p.exists():
@@ -78,6 +85,19 @@ def get_midi_ports():
         logger.warning(f"Could not list MIDI ports: {e}")
 
 
+def freeze_args(args: argparse.Namespace):
+    """
+    Freeze parsed arguments into an immutable, slotted BridgeConfig.
+
+    The dataclass is generated from the parser's destinations, so it never
+    drifts from the CLI definition.
+    """
+    BridgeConfig = dataclasses.make_dataclass(
+        "BridgeConfig", list(vars(args)), frozen=True, slots=True
+    )
+    return BridgeConfig(**vars(args))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Real-time Aria + Ableton bridge",
@@ -160,6 +180,12 @@ def main():
         default=480,
         help="MIDI ticks per quarter note (default: 480)",
     )
+    parser.add_argument(
+        "--prefill_interval",
+        type=float,
+        default=0.1,
+        help="Seconds between speculative prompt prefills while listening; 0 disables (default: 0.1)",
+    )
     parser.add_argument(
         "--temperature",
         type=float,
@@ -178,94 +204,190 @@ def main():
         choices=["cuda", "cpu"],
         help="Device for model inference (default: cuda)",
     )
+    parser.add_argument(
+        "--precision",
+        default="fp32",
+        choices=["fp32", "bf16"],
+        help="Model weight precision (default: fp32)",
+    )
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=1,
+        help="Candidate continuations sampled per generation; best log-prob wins (default: 1)",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="torch.compile the decode step; compiled at startup, with or without the CUDA graph (default: off)",
+    )
+    parser.add_argument(
+        "--no_cuda_graph",
+        action="store_true",
+        help="Disable CUDA graph capture of the decode step (default: on for cuda)",
+    )
+    parser.add_argument(
+        "--io_process",
+        action="store_true",
+        help="Read MIDI input in a separate process via a shared-memory ring (default: off)",
+    )
+    parser.add_argument(
+        "--gen_process",
+        action="store_true",
+        help="Run the Aria model in a separate process so inference never holds the bridge's GIL (default: off)",
+    )
+    parser.add_argument(
+        "--rt_prio",
+        type=int,
+        default=None,
+        help="SCHED_FIFO priority (1-99) for the MIDI input callback thread; Linux, needs CAP_SYS_NICE",
+    )
+    parser.add_argument(
+        "--rt_core",
+        type=int,
+        default=None,
+        help="CPU core to pin the MIDI input callback thread to (Linux)",
+    )
+    parser.add_argument(
+        "--out_rt_prio",
+        type=int,
+        default=None,
+        help="Real-time priority for the output thread (SCHED_FIFO 1-99 on Linux; time-critical on Windows)",
+    )
+    parser.add_argument(
+        "--out_rt_core",
+        type=int,
+        default=None,
+        help="CPU core to pin the output thread to (Linux)",
+    )
     parser.add_argument(
         "--list-ports",
         action="store_true",
         help="List available MIDI ports and exit",
     )
 
-    args = parser.parse_args()
+    cfg = freeze_args(parser.parse_args())
 
-    if args.list_ports:
+    if cfg.list_ports:
         get_midi_ports()
         return 0
 
-    # Verify CUDA if needed
-    if args.device == "cuda":
+    # Torch takes seconds to import cold; start it now so it overlaps with
+    # checkpoint discovery instead of running before it
+    torch_import = threading.Thread(
+        target=lambda: __import__("torch"), name="torch-import", daemon=True
+    )
+    torch_import.start()
+
+    # Find checkpoint (fails fast without waiting on torch)
+    try:
+        checkpoint_path = find_checkpoint(cfg.checkpoint)
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return 1
+
+    torch_import.join()
+
+    # Verify CUDA if needed (ARIA_SKIP_CUDA_CHECK=1 skips the probe, which
+    # initializes the CUDA context just to print the device name)
+    if cfg.device == "cuda" and not os.environ.get("ARIA_SKIP_CUDA_CHECK"):
         import torch
         if not torch.cuda.is_available():
             logger.error("CUDA requested but not available. Use --device cpu")
             return 1
         logger.info(f"CUDA device: {torch.cuda.get_device_name(0)}")
 
-    # Find checkpoint
-    try:
-        checkpoint_path = find_checkpoint(args.checkpoint)
-    except FileNotFoundError as e:
-        logger.error(str(e))
-        return 1
+    # Spawn the MIDI input process before loading the model; it never
+    # imports torch
+    io_ring = io_process = io_stop = io_pulse = None
+    engine = None
+    if cfg.io_process:
+        try:
+            from .midi_io_process import start_midi_input_process
+        except ImportError:
+            from midi_io_process import start_midi_input_process
+        io_ring, io_process, io_stop, io_pulse = start_midi_input_process(
+            cfg.in_port, rt_prio=cfg.rt_prio, rt_core=cfg.rt_core
+        )
+        logger.info(f"MIDI I/O process started (pid={io_process.pid}, shm={io_ring.name})")
 
     # Import and start bridge
     try:
         # Handle both module and script execution
         try:
-            from .midi_buffer import RollingMidiBuffer
             from .aria_engine import AriaEngine
             from .ableton_bridge_engine import AbletonBridge
             from .tempo_tracker import TempoTracker
         except ImportError:
-            from midi_buffer import RollingMidiBuffer
             from aria_engine import AriaEngine
             from ableton_bridge_engine import AbletonBridge
             from tempo_tracker import TempoTracker
 
-        logger.info(f"Connecting to ports: IN={args.in_port}, OUT={args.out_port}")
+        logger.info(f"Connecting to ports: IN={cfg.in_port}, OUT={cfg.out_port}")
         logger.info(f"Checkpoint: {checkpoint_path}")
         logger.info(
-            f"Listen {args.listen_seconds}s → Generate {args.gen_seconds}s → "
-            f"Cooldown {args.cooldown_seconds}s"
+            f"Listen {cfg.listen_seconds}s → Generate {cfg.gen_seconds}s → "
+            f"Cooldown {cfg.cooldown_seconds}s"
         )
-        if args.clock_in:
-            logger.info(f"MIDI Clock input: {args.clock_in}")
+        if cfg.clock_in:
+            logger.info(f"MIDI Clock input: {cfg.clock_in}")
 
         # Create components
-        buffer = RollingMidiBuffer(window_seconds=args.listen_seconds)
-        engine = AriaEngine(
+        if cfg.gen_process:
+            try:
+                from .gen_process import RemoteAriaEngine as engine_cls
+            except ImportError:
+                from gen_process import RemoteAriaEngine as engine_cls
+        else:
+            engine_cls = AriaEngine
+        engine = engine_cls(
             checkpoint_path=checkpoint_path,
-            device=args.device,
+            device=cfg.device,
             config_name="medium",
+            precision=cfg.precision,
+            temperature=cfg.temperature,
+            top_p=cfg.top_p,
+            cuda_graph=not cfg.no_cuda_graph,
+            num_candidates=cfg.candidates,
+            compile=cfg.compile,
         )
         
         # Start tempo tracker only if NOT using clock_in (they conflict on same MIDI port)
         tempo_tracker = None
-        if args.clock_in:
-            logger.info(f"Using ClockGrid on '{args.clock_in}'; disabling TempoTracker (port conflict)")
+        if cfg.clock_in:
+            logger.info(f"Using ClockGrid on '{cfg.clock_in}'; disabling TempoTracker (port conflict)")
         else:
             # Legacy: use tempo tracker without grid
-            if args.clock_in:
+            if cfg.clock_in:
                 try:
-                    tempo_tracker = TempoTracker(clock_port_name=args.clock_in)
+                    tempo_tracker = TempoTracker(clock_port_name=cfg.clock_in)
                     tempo_tracker.start()
-                    logger.info(f"Tempo tracker started on '{args.clock_in}'")
+                    logger.info(f"Tempo tracker started on '{cfg.clock_in}'")
                 except Exception as e:
                     logger.warning(f"Failed to start tempo tracker: {e}. Continuing without tempo sync.")
         
         bridge = AbletonBridge(
-            in_port_name=args.in_port,
-            out_port_name=args.out_port,
-            midi_buffer=buffer,
+            in_port_name=cfg.in_port,
+            out_port_name=cfg.out_port,
             aria_engine=engine,
             tempo_tracker=tempo_tracker,
-            clock_in=args.clock_in,
-            measures=args.measures,
-            beats_per_bar=args.beats_per_bar,
-            gen_measures=args.gen_measures,
-            human_measures=args.human_measures,
-            cooldown_seconds=args.cooldown_seconds,
-            temperature=args.temperature,
-            top_p=args.top_p,
-            quantize=args.quantize,
-            ticks_per_beat=args.ticks_per_beat,
+            clock_in=cfg.clock_in,
+            measures=cfg.measures,
+            beats_per_bar=cfg.beats_per_bar,
+            gen_measures=cfg.gen_measures,
+            human_measures=cfg.human_measures,
+            cooldown_seconds=cfg.cooldown_seconds,
+            temperature=cfg.temperature,
+            top_p=cfg.top_p,
+            quantize=cfg.quantize,
+            ticks_per_beat=cfg.ticks_per_beat,
+            prefill_interval=cfg.prefill_interval,
+            input_ring=io_ring,
+            rt_prio=cfg.rt_prio,
+            rt_core=cfg.rt_core,
+            out_rt_prio=cfg.out_rt_prio,
+            out_rt_core=cfg.out_rt_core,
+            shared_pulse=io_pulse,
         )
 
         bridge.run()
@@ -275,6 +397,14 @@ def main():
         logger.exception(f"Fatal error: {e}")
         return 1
 
+    finally:
+        if cfg.gen_process and engine is not None:
+            engine.close()
+        if io_process is not None:
+            io_stop.set()
+            io_process.join(timeout=2)
+            io_ring.close()
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,34 +1,165 @@
 """Core orchestration for real-time Ableton-Aria bridge."""
 
+import contextlib
+import heapq
+import itertools
 import logging
 import os
 import queue
 import threading
 import time
-import tempfile
 from typing import Optional
+
+import numpy as np
+
+try:
+    import mido
+except ImportError:
+    raise ImportError("mido is required. Install with: pip install mido")
+
+try:
+    from . import rtlog
+    from .clock_grid import ClockGrid
+    from .midi_buffer import TimestampedMidiMsg
+    from .prompt_midi import buffer_to_midi_file
+    from .ring import NO_STAMP, ObjectRing, SpscRing, pack_midi
+    from .rt_priority import promote_current_thread
+except ImportError:
+    import rtlog
+    from clock_grid import ClockGrid
+    from midi_buffer import TimestampedMidiMsg
+    from prompt_midi import buffer_to_midi_file
+    from ring import NO_STAMP, ObjectRing, SpscRing, pack_midi
+    from rt_priority import promote_current_thread
+
 logger = logging.getLogger(__name__)
 
+# Deferred log messages for the input/output threads (-1 means none)
+LOG_HUMAN_NOTE_ON = rtlog.define(logger, logging.INFO, "[HUMAN] bar=%d note_on pitch=%d vel=%d pulse=%d")
+LOG_HUMAN_NOTE_OFF = rtlog.define(logger, logging.DEBUG, "[HUMAN] bar=%d note_off pitch=%d pulse=%d")
+LOG_HUMAN_SUSTAIN = rtlog.define(logger, logging.DEBUG, "[HUMAN] bar=%d sustain=%d pulse=%d")
+LOG_OUT_SCHEDULED = rtlog.define(logger, logging.DEBUG, "OUT scheduled: note=%d vel=%d target_pulse=%d now=%d")
+
+# MIDI status nibbles handled on the input path
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+CONTROL_CHANGE = 0xB0
+
+# mido message types forwarded from generated MIDI
+CHANNEL_MSG_TYPES = frozenset(('note_on', 'note_off', 'control_change'))
+
+
+def _match_port(available: list, name: str) -> int:
+    """Index of port `name` in `available`: exact match, else first prefix match."""
+    if name in available:
+        return available.index(name)
+    matched = [i for i, p in enumerate(available) if p.startswith(name)]
+    if not matched:
+        raise OSError(f"unknown port '{name}'")
+    return matched[0]
+
+
+# One row per generated channel message; offset is in clock pulses from the
+# start of the file
+PULSE_EVENT_DTYPE = np.dtype([('offset', np.int64), ('status', np.uint8), ('data1', np.uint8), ('data2', np.uint8)])
+
+
+def load_pulse_events(midi, default_ticks_per_beat: int = 480) -> np.ndarray:
+    """
+    Parse note_on/note_off/control_change messages of a MIDI file into a
+    PULSE_EVENT_DTYPE array, stably sorted by pulse offset.
+
+    `midi` is a path or an already-loaded mido.MidiFile. Each message is
+    decoded once here; the scheduler then carries raw bytes instead of
+    mido.Message copies.
+    """
+    mid = midi if isinstance(midi, mido.MidiFile) else mido.MidiFile(midi)
+    tpq = mid.ticks_per_beat if mid.ticks_per_beat else default_ticks_per_beat
+
+    rows = []
+    for track in mid.tracks:
+        abs_tick = 0
+        for msg in track:
+            abs_tick += msg.time
+            if msg.type in CHANNEL_MSG_TYPES:
+                status, data1, data2 = msg.bytes()
+                rows.append((abs_tick, status, data1, data2))
+
+    events = np.array(rows, dtype=PULSE_EVENT_DTYPE)
+    # tick -> pulse: (tick / ticks_per_beat) * 24
+    events['offset'] = events['offset'] * 24 // tpq
+    return events[np.argsort(events['offset'], kind='stable')]
+
+
+class BarBuffers:
+    """
+    Per-bar human event lists in a fixed ring of preallocated lists.
+
+    Slot `bar & mask` holds bar `bar`; a slot is reclaimed (cleared in place)
+    the first time a newer bar maps onto it, so the input path never
+    allocates a list or grows a dict. Reads mirror the dict this replaced:
+    `bar in buffers`, `buffers[bar]`, `buffers.get(bar, default)`, `clear()`.
+    """
+
+    def __init__(self, min_bars: int = 8):
+        size = 1 << max(3, (min_bars - 1).bit_length())
+        self._lists = [[] for _ in range(size)]
+        self._bars = [None] * size  # Bar index currently held by each slot
+        self._mask = size - 1
+
+    def append(self, bar: int, msg) -> None:
+        i = bar & self._mask
+        if self._bars[i] != bar:
+            self._lists[i].clear()
+            self._bars[i] = bar
+        self._lists[i].append(msg)
+
+    def __contains__(self, bar) -> bool:
+        return self._bars[bar & self._mask] == bar
+
+    def __getitem__(self, bar: int) -> list:
+        i = bar & self._mask
+        if self._bars[i] != bar:
+            raise KeyError(bar)
+        return self._lists[i]
+
+    def get(self, bar: int, default=None):
+        i = bar & self._mask
+        return self._lists[i] if self._bars[i] == bar else default
+
+    def clear(self) -> None:
+        for i in range(len(self._bars)):
+            self._bars[i] = None
+            self._lists[i].clear()
+
 
 class GenerationJob:
     """A job to generate music for a specific bar/bars."""
-    def __init__(self, bar_index: int, prompt_events: list, aria_engine, temperature: float, top_p: float, gen_bars: int = 2):
+    __slots__ = (
+        'bar_index', 'prompt_events', 'aria_engine', 'temperature', 'top_p',
+        'gen_bars', 'prefill_only', 'ticks_per_beat', 'result_events', 'error',
+    )
+
+    def __init__(self, bar_index: int, prompt_events: list, aria_engine, temperature: float, top_p: float, gen_bars: int = 2, prefill_only: bool = False, ticks_per_beat: int = 480):
         self.bar_index = bar_index  # Starting bar index
         self.prompt_events = prompt_events
         self.aria_engine = aria_engine
         self.temperature = temperature
         self.top_p = top_p
         self.gen_bars = gen_bars  # Number of measures to generate
-        self.result_midi_path = None  # Set when generation completes
+        self.prefill_only = prefill_only  # Speculative KV-cache prefill, no sampling
+        self.ticks_per_beat = ticks_per_beat  # Fallback resolution for parsing the result
+        self.result_events = None  # PULSE_EVENT_DTYPE array, set when generation completes
+        self.error = None  # Set if generation raised
 
 
 class GenerationWorker(threading.Thread):
     """Background thread that processes generation jobs asynchronously."""
     
-    def __init__(self, job_queue: queue.Queue):
+    def __init__(self, job_queue: ObjectRing):
         """
         Args:
-            job_queue: Queue of GenerationJob objects
+            job_queue: SPSC ring of GenerationJob objects
         """
         super().__init__(daemon=True)
         self.job_queue = job_queue
@@ -39,58 +170,50 @@ class GenerationWorker(threading.Thread):
         logger.info("GenerationWorker thread started")
         try:
             while self.running:
-                try:
-                    job = self.job_queue.get(timeout=0.1)
-                    if job is None:  # Sentinel to stop
-                        break
-                    
+                job = self.job_queue.pop()
+                if job is None:
+                    self.job_queue.wait(timeout=0.1)
+                    continue
+
+                if not job.prefill_only:
                     logger.info(f"[gen_worker] Starting generation for bar {job.bar_index} ({job.gen_bars} bars)")
-                    
-                    # Build prompt MIDI
-                    try:
-                        from .prompt_midi import buffer_to_tempfile_midi
-                    except Exception:
-                        from prompt_midi import buffer_to_tempfile_midi
-                    
-                    prompt_midi_path = buffer_to_tempfile_midi(
-                        job.prompt_events,
-                        window_seconds=0,
-                        ticks_per_beat=480,
-                    )
-                    
-                    # Call Aria to generate N bars
-                    start_time = time.time()
-                    try:
+                
+                # Build prompt MIDI in memory (no temp file round-trip)
+                prompt_midi = buffer_to_midi_file(
+                    job.prompt_events,
+                    window_seconds=0,
+                    ticks_per_beat=480,
+                )
+                
+                # Call Aria to generate N bars
+                start_time = time.time()
+                try:
+                    if job.prefill_only:
+                        n = job.aria_engine.prefill(prompt_midi, prompt_duration_s=4)
+                        logger.debug("[gen_worker] Prefilled %d tokens for bar %d in %.3fs", n, job.bar_index, time.time() - start_time)
+                    else:
                         # Horizon in seconds: gen_bars * 1.0s per bar (roughly)
                         horizon_s = job.gen_bars * 1.0
-                        midi_path = job.aria_engine.generate(
-                            prompt_midi_path=prompt_midi_path,
+                        midi = job.aria_engine.generate(
+                            prompt_midi=prompt_midi,
                             prompt_duration_s=4,
                             horizon_s=horizon_s,
                             temperature=job.temperature,
                             top_p=job.top_p,
+                            return_midi=True,
                         )
                         gen_time = time.time() - start_time
-                        
-                        if midi_path:
-                            job.result_midi_path = midi_path
+                    
+                        if midi:
+                            # Parse here, off the scheduling path
+                            job.result_events = load_pulse_events(midi, job.ticks_per_beat)
                             logger.info(f"[gen_worker] Bar {job.bar_index} ({job.gen_bars}-bar generation) done in {gen_time:.2f}s")
                         else:
                             logger.warning(f"[gen_worker] Bar {job.bar_index} generation returned None")
-                    except Exception as e:
-                        logger.exception(f"[gen_worker] Bar {job.bar_index} generation failed: {e}")
-                        job.error = str(e)
-                    finally:
-                        # Cleanup prompt
-                        try:
-                            os.unlink(prompt_midi_path)
-                        except Exception:
-                            pass
-                    
-                    self.job_queue.task_done()
-                    
-                except queue.Empty:
-                    pass
+                except Exception as e:
+                    logger.exception(f"[gen_worker] Bar {job.bar_index} generation failed: {e}")
+                    job.error = str(e)
+
         except Exception as e:
             logger.exception(f"GenerationWorker error: {e}")
         finally:
@@ -102,9 +225,10 @@ class AbletonBridge:
     Orchestrates real-time MIDI I/O and Aria generation.
 
     Flow:
-    1. Input thread reads MIDI from loopMIDI port and adds to rolling buffer
+    1. rtmidi callback pushes raw MIDI bytes into a lock-free SPSC ring;
+       the input thread drains it in batches into per-bar buffers
     2. Generation thread runs every N ms:
-       - Snapshot rolling buffer
+       - Snapshot the finished bar's buffer
        - Convert to MIDI file
        - Run Aria inference
        - Queue output events
@@ -113,11 +237,12 @@ class AbletonBridge:
     No human->human feedback by default: only ingests human input, not generated notes.
     """
 
+    GEN_QUEUE_SIZE = 4  # Pending GenerationJobs (prefill + bar-boundary)
+
     def __init__(
         self,
         in_port_name: str,
         out_port_name: str,
-        midi_buffer,
         aria_engine,
         tempo_tracker=None,
         # Grid / clock parameters
@@ -131,12 +256,18 @@ class AbletonBridge:
         top_p: float = 0.9,
         quantize: bool = False,
         ticks_per_beat: int = 480,
+        prefill_interval: float = 0.1,
+        input_ring=None,
+        rt_prio: Optional[int] = None,
+        rt_core: Optional[int] = None,
+        out_rt_prio: Optional[int] = None,
+        out_rt_core: Optional[int] = None,
+        shared_pulse=None,
     ):
         """
         Args:
             in_port_name: Input MIDI port (e.g., "ARIA_IN")
             out_port_name: Output MIDI port (e.g., "ARIA_OUT")
-            midi_buffer: RollingMidiBuffer instance
             aria_engine: AriaEngine instance
             tempo_tracker: TempoTracker instance (optional)
             listen_seconds: Duration to listen before generating (e.g., 4.0)
@@ -146,10 +277,21 @@ class AbletonBridge:
             top_p: Top-p sampling
             quantize: Whether to quantize output to 1/16 grid
             ticks_per_beat: MIDI ticks per quarter note
+            prefill_interval: Seconds between speculative prefills of the
+                partial prompt while collecting human bars (0 disables)
+            input_ring: Ring already fed by an external producer (e.g. the
+                shared-memory ring of the MIDI I/O process); when given, the
+                bridge does not open the input port itself
+            rt_prio: SCHED_FIFO priority for the MIDI input callback thread
+            rt_core: CPU core to pin the MIDI input callback thread to
+            out_rt_prio: Real-time priority for the output thread
+            out_rt_core: CPU core to pin the output thread to
+            shared_pulse: Shared Value the ClockGrid mirrors its pulse count
+                into (from start_midi_input_process), so the I/O process can
+                stamp input at arrival
         """
         self.in_port_name = in_port_name
         self.out_port_name = out_port_name
-        self.midi_buffer = midi_buffer
         self.aria_engine = aria_engine
         self.tempo_tracker = tempo_tracker
         # Grid/clock
@@ -164,13 +306,28 @@ class AbletonBridge:
         self.top_p = top_p
         self.quantize = quantize
         self.ticks_per_beat = ticks_per_beat
+        self.prefill_interval = prefill_interval
+        self._prefill_signature = None  # (bar_index, n_events) last prefilled
 
         # MIDI I/O
-        self.in_port = None
+        self.in_port = None  # rtmidi.MidiIn (callback-driven)
         self.out_port = None
 
-        # Queue of (msg_type, msg_data)
-        self.event_queue = queue.Queue()
+        # rtmidi callback -> input thread handoff (packed uint64 records)
+        self.external_input = input_ring is not None
+        self.input_ring = input_ring if input_ring is not None else SpscRing(capacity=4096)
+        self.rt_prio = rt_prio
+        self.rt_core = rt_core
+        # The callback thread belongs to the MIDI driver, so it promotes
+        # itself on its first invocation
+        self._promote_pending = rt_prio is not None or rt_core is not None
+        self.out_rt_prio = out_rt_prio
+        self.out_rt_core = out_rt_core
+        self.shared_pulse = shared_pulse
+
+        # (msg_type, msg_data) items for the output thread; non-blocking so
+        # the output loop services scheduled messages at a steady cadence
+        self.event_queue = ObjectRing(capacity=256)
 
         # Control
         self.running = False
@@ -183,18 +340,26 @@ class AbletonBridge:
 
         # ClockGrid will be set if clock_in provided
         self.clock_grid = None
+        self.pulses_per_bar = None  # Cached from the grid; fixed for a run
 
         self.listen_start_time = None
         self.cooldown_end_time = None
 
         # Stats
         self.generation_count = 0
+        self.note_on_count = 0  # Human note_ons (vel > 0); written by the input thread only
+        self.human_activity = False  # note_on/sustain seen since the cycle's buffers were cleared
         self.skip_count = 0
         self.generation_times = []
 
-        # Scheduler for model output: list of (target_pulse, mido.Message)
-        self.scheduled_messages = []
-        self.scheduled_lock = threading.RLock()
+        # Scheduler for model output: min-heap of (target_pulse, seq,
+        # [status, data1, data2]); seq breaks ties in insertion order. Only the
+        # output thread touches the heap; producers hand it batches of entries
+        # through the intake queue as (replace, entries), so there is no lock
+        # on the send path.
+        self.scheduled_heap = []
+        self._schedule_seq = itertools.count()
+        self._schedule_intake = queue.SimpleQueue()
         self.model_end_pulse = None
         self.last_boundary_pulse = None
 
@@ -205,19 +370,20 @@ class AbletonBridge:
         self.bars_collected_in_phase = 0  # Track bars collected in current PHASE_HUMAN
 
         # Per-bar buffering: bar_index -> list of (pulse, event_type, msg_data)
-        self.human_bar_buffers = {}  # dict[int, list[TimestampedMidiMsg]]
-        self.generated_bar_queue = {}  # dict[int, list[mido.Message]]
+        # Room for one collection phase plus the bars that arrive while it generates
+        self.human_bar_buffers = BarBuffers(min_bars=2 * human_measures + 2)
         self.last_scheduled_bar = None  # Highest bar index we've scheduled for playback
 
         # Failsafe: force generation after 6 seconds of no generation
         self.last_generation_time = time.time()
         self.failsafe_forced = False
 
-        # Asynchronous generation worker for MVP (1-bar-in → N-measures-out cycle)
-        self.gen_job_queue = queue.Queue()
+        # Asynchronous generation worker for MVP (1-bar-in → N-measures-out cycle).
+        # Bounded SPSC ring: the generation thread is the only producer
+        # (prefill and bar-boundary jobs), so it never blocks on or piles up
+        # behind a slow generate(); push() fails instead when full.
+        self.gen_job_queue = ObjectRing(capacity=self.GEN_QUEUE_SIZE)
         self.pending_ai_job = None  # Current job being processed
-        self.pending_ai_response = None  # Path to N-measure MIDI when ready
-        self.pending_ai_response_lock = threading.RLock()
         self.gen_worker = GenerationWorker(self.gen_job_queue)
 
     def run(self):
@@ -226,12 +392,13 @@ class AbletonBridge:
             self._setup_midi_ports()
             # Start clock grid if requested
             if self.clock_in:
-                try:
-                    from .clock_grid import ClockGrid
-                except Exception:
-                    from clock_grid import ClockGrid
-
-                self.clock_grid = ClockGrid(clock_port_name=self.clock_in, measures=self.measures, beats_per_bar=self.beats_per_bar)
+                self.clock_grid = ClockGrid(
+                    clock_port_name=self.clock_in,
+                    measures=self.measures,
+                    beats_per_bar=self.beats_per_bar,
+                    shared_pulse=self.shared_pulse,
+                )
+                self.pulses_per_bar = self.clock_grid.get_pulses_per_bar()
                 # Do NOT register boundary callback; we use anchor-based boundary detection in _generation_loop
                 try:
                     self.clock_grid.start()
@@ -239,6 +406,7 @@ class AbletonBridge:
                 except Exception as e:
                     logger.warning(f"Failed to start ClockGrid: {e}")
             self.running = True
+            rtlog.start()
 
             # Start generation worker
             self.gen_worker.running = True
@@ -270,24 +438,27 @@ class AbletonBridge:
         """Stop all threads and close ports."""
         self.running = False
         self.gen_worker.running = False
+        self.input_ring.wake()
 
         # Wait for generation worker to finish
         if self.gen_worker.is_alive():
-            self.gen_job_queue.put(None)  # Send sentinel
+            self.gen_job_queue.wake()  # Worker exits on running=False after its current job
             self.gen_worker.join(timeout=2)
 
         for t in self.threads:
             t.join(timeout=2)
+        rtlog.stop()
 
         if self.tempo_tracker:
             self.tempo_tracker.stop()
 
         if self.in_port:
-            self.in_port.close()
+            self.in_port.cancel_callback()
+            self.in_port.close_port()
             logger.info("Input port closed")
 
         if self.out_port:
-            self.out_port.close()
+            self.out_port.close_port()
             logger.info("Output port closed")
 
         logger.info(
@@ -298,140 +469,131 @@ class AbletonBridge:
     def _setup_midi_ports(self):
         """Open MIDI input and output ports."""
         try:
-            import mido
+            import rtmidi
         except ImportError:
-            raise ImportError("mido is required. Install with: pip install mido")
+            raise ImportError("python-rtmidi is required. Install with: pip install python-rtmidi")
 
-        # Input port
-        try:
-            # Try exact name first, then try with port number suffix
-            in_port_name = self.in_port_name
+        # Input port: opened with python-rtmidi directly so the driver thread
+        # hands raw bytes to _on_midi_in without building mido Messages
+        if self.external_input:
+            logger.info(f"Input '{self.in_port_name}' is read by the MIDI I/O process")
+        else:
             try:
-                self.in_port = mido.open_input(in_port_name)
-            except (OSError, ValueError):
-                # Port not found, try matching with available ports
-                available = mido.get_input_names()
-                matched = [p for p in available if p.startswith(in_port_name)]
-                if matched:
-                    in_port_name = matched[0]
-                    self.in_port = mido.open_input(in_port_name)
-                else:
-                    raise
-
-            logger.info(f"Input port opened: {in_port_name}")
-        except Exception as e:
-            logger.error(f"Failed to open input port '{self.in_port_name}': {e}")
-            logger.info("Listing available input ports: " + ", ".join(mido.get_input_names()))
-            raise
-
-        # Output port
+                midi_in = rtmidi.MidiIn()
+                available = midi_in.get_ports()
+                # Try exact name first, then try with port number suffix
+                port_index = _match_port(available, self.in_port_name)
+                midi_in.open_port(port_index)
+                midi_in.set_callback(self._on_midi_in)
+                self.in_port = midi_in
+
+                logger.info(f"Input port opened: {available[port_index]}")
+            except Exception as e:
+                logger.error(f"Failed to open input port '{self.in_port_name}': {e}")
+                logger.info("Listing available input ports: " + ", ".join(mido.get_input_names()))
+                raise
+
+        # Output port: also raw rtmidi, so sends are one C call per message
+        # with bytes prepared up front instead of going through mido's port
         try:
-            # Try exact name first, then try with port number suffix
-            out_port_name = self.out_port_name
-            try:
-                self.out_port = mido.open_output(out_port_name)
-            except (OSError, ValueError):
-                # Port not found, try matching with available ports
-                available = mido.get_output_names()
-                matched = [p for p in available if p.startswith(out_port_name)]
-                if matched:
-                    out_port_name = matched[0]
-                    self.out_port = mido.open_output(out_port_name)
-                else:
-                    raise
+            midi_out = rtmidi.MidiOut()
+            available = midi_out.get_ports()
+            port_index = _match_port(available, self.out_port_name)
+            midi_out.open_port(port_index)
+            self.out_port = midi_out
 
-            logger.info(f"Output port opened: {out_port_name}")
+            logger.info(f"Output port opened: {available[port_index]}")
         except Exception as e:
             logger.error(f"Failed to open output port '{self.out_port_name}': {e}")
             logger.info("Listing available output ports: " + ", ".join(mido.get_output_names()))
             raise
 
+    def _on_midi_in(self, event, data=None):
+        """rtmidi callback: stamp with the current pulse and push to the ring.
+
+        Runs on the rtmidi driver thread, so it does no logging and no
+        per-message object construction beyond the packed record.
+        """
+        if self._promote_pending:
+            self._promote_pending = False
+            promote_current_thread(self.rt_prio, self.rt_core)
+        message = event[0]
+        if len(message) != 3:
+            return
+        grid = self.clock_grid
+        stamp = grid.get_pulse_count() if grid is not None else NO_STAMP
+        self.input_ring.push(pack_midi(stamp, message[0], message[1], message[2]))
+
     def _input_loop(self):
-        """Read live MIDI input and add to rolling buffer."""
+        """Drain the input ring in batches and assign messages to bar buffers."""
         logger.info("Input thread started")
+        ring = self.input_ring
         try:
             while self.running:
-                # Poll for messages (non-blocking)
-                for msg in self.in_port.iter_pending():
-                    # Tag messages with current pulse if clock available
-                    pulse = None
-                    if self.clock_grid:
-                        try:
-                            pulse = self.clock_grid.get_pulse_count()
-                        except Exception:
-                            pulse = None
-
-                    if msg.type == 'note_on':
-                        # Set anchor on first human note if clock is running
-                        if self.anchor_pulse is None and self.clock_grid and self.clock_grid.get_is_running():
-                            self.anchor_pulse = pulse
-                            pulses_per_bar = self.clock_grid.get_pulses_per_bar()
-                            self.next_bar_boundary_pulse = self.anchor_pulse + pulses_per_bar
-                            self.bar_index = 0
-                            logger.info(f"[anchor] set at pulse={self.anchor_pulse}, pulses_per_bar={pulses_per_bar}")
-
-                        # Assign to bar buffer
-                        if self.anchor_pulse is not None and pulse is not None:
-                            pulses_per_bar = self.clock_grid.get_pulses_per_bar()
-                            bar = (pulse - self.anchor_pulse) // pulses_per_bar
-                            if bar not in self.human_bar_buffers:
-                                self.human_bar_buffers[bar] = []
-                        else:
-                            bar = None
-
-                        msg_obj = type('MidiMsg', (), {'pulse': pulse, 'msg_type': 'note_on', 'note': msg.note, 'velocity': msg.velocity})()
-                        self.midi_buffer.add_message('note_on', note=msg.note, velocity=msg.velocity, pulse=pulse)
-                        if bar is not None:
-                            self.human_bar_buffers[bar].append(msg_obj)
-                        logger.info(f"[HUMAN] bar={bar} note_on pitch={msg.note} vel={msg.velocity} pulse={pulse}")
-
-                    elif msg.type == 'note_off':
-                        # Assign note_off to the same bar as note_on
-                        if self.anchor_pulse is not None and pulse is not None:
-                            pulses_per_bar = self.clock_grid.get_pulses_per_bar()
-                            bar = (pulse - self.anchor_pulse) // pulses_per_bar
-                            if bar not in self.human_bar_buffers:
-                                self.human_bar_buffers[bar] = []
-                        else:
-                            bar = None
-
-                        msg_obj = type('MidiMsg', (), {'pulse': pulse, 'msg_type': 'note_off', 'note': msg.note, 'velocity': msg.velocity})()
-                        self.midi_buffer.add_message(
-                            'note_off',
-                            note=msg.note,
-                            velocity=msg.velocity,
-                            pulse=pulse,
-                        )
-                        if bar is not None:
-                            self.human_bar_buffers[bar].append(msg_obj)
-                        logger.debug(f"[HUMAN] bar={bar} note_off pitch={msg.note} pulse={pulse}")
-
-                    elif msg.type == 'control_change' and msg.control == 64:
-                        # Sustain pedal - assign to bar buffer
-                        if self.anchor_pulse is not None and pulse is not None:
-                            pulses_per_bar = self.clock_grid.get_pulses_per_bar()
-                            bar = (pulse - self.anchor_pulse) // pulses_per_bar
-                            if bar not in self.human_bar_buffers:
-                                self.human_bar_buffers[bar] = []
-                        else:
-                            bar = None
-
-                        msg_obj = type('MidiMsg', (), {'pulse': pulse, 'msg_type': 'control_change', 'control': 64, 'value': msg.value})()
-                        self.midi_buffer.add_message(
-                            'control_change',
-                            control=64,
-                            value=msg.value,
-                            pulse=pulse,
-                        )
-                        if bar is not None:
-                            self.human_bar_buffers[bar].append(msg_obj)
-                        logger.debug(f"[HUMAN] bar={bar} sustain={msg.value} pulse={pulse}")
-
-                time.sleep(0.001)  # Small sleep to avoid busy loop
+                if not ring.wait(timeout=0.1):
+                    continue
+                # Records from the I/O process are unstamped until the clock
+                # grid publishes its shared pulse; stamp those at drain time
+                grid = self.clock_grid
+                drain_pulse = grid.get_pulse_count() if grid is not None else None
+                for word in ring.drain().tolist():
+                    stamp = word >> 32
+                    pulse = drain_pulse if stamp == NO_STAMP else stamp
+                    self._handle_input(
+                        pulse,
+                        (word >> 16) & 0xF0,
+                        (word >> 8) & 0xFF,
+                        word & 0xFF,
+                    )
 
         except Exception as e:
             logger.exception(f"Input loop error: {e}")
 
+    def _bar_for(self, pulse):
+        """Bar index (relative to the anchor) that `pulse` falls in, or None before anchoring."""
+        anchor = self.anchor_pulse
+        if anchor is None or pulse is None:
+            return None
+        return (pulse - anchor) // self.pulses_per_bar
+
+    def _handle_input(self, pulse, kind: int, data1: int, data2: int):
+        """Assign one drained input message to its bar buffer."""
+        if kind == NOTE_ON:
+            if data2:
+                self.note_on_count += 1
+                self.human_activity = True
+            # Set anchor on first human note if clock is running
+            if self.anchor_pulse is None and self.clock_grid and self.clock_grid.get_is_running():
+                self.anchor_pulse = pulse
+                pulses_per_bar = self.pulses_per_bar
+                self.next_bar_boundary_pulse = self.anchor_pulse + pulses_per_bar
+                self.bar_index = 0
+                logger.info(f"[anchor] set at pulse={self.anchor_pulse}, pulses_per_bar={pulses_per_bar}")
+
+            # Assign to bar buffer
+            bar = self._bar_for(pulse)
+
+            if bar is not None:
+                self.human_bar_buffers.append(bar, TimestampedMidiMsg('note_on', note=data1, velocity=data2, pulse=pulse))
+            rtlog.push(LOG_HUMAN_NOTE_ON, -1 if bar is None else bar, data1, data2, -1 if pulse is None else pulse)
+
+        elif kind == NOTE_OFF:
+            # Assign note_off to the bar its pulse falls in
+            bar = self._bar_for(pulse)
+
+            if bar is not None:
+                self.human_bar_buffers.append(bar, TimestampedMidiMsg('note_off', note=data1, velocity=data2, pulse=pulse))
+            rtlog.push(LOG_HUMAN_NOTE_OFF, -1 if bar is None else bar, data1, -1 if pulse is None else pulse)
+
+        elif kind == CONTROL_CHANGE and data1 == 64:
+            self.human_activity = True
+            # Sustain pedal - assign to bar buffer
+            bar = self._bar_for(pulse)
+
+            if bar is not None:
+                self.human_bar_buffers.append(bar, TimestampedMidiMsg('control_change', control=64, value=data2, pulse=pulse))
+            rtlog.push(LOG_HUMAN_SUSTAIN, -1 if bar is None else bar, data2, -1 if pulse is None else pulse)
+
     def _generation_loop(self):
         """
         MVP Generation Loop:
@@ -442,6 +604,8 @@ class AbletonBridge:
         logger.info(f"Generation thread started (MVP 1-bar-in -> {self.gen_measures}-measures-out)")
         try:
             last_failsafe_check = time.time()
+            note_ons_at_check = self.note_on_count
+            last_prefill = 0.0
             while self.running:
                 # Check for pending AI response ready to schedule
                 if self.phase == self.PHASE_HUMAN and self.pending_ai_job is not None:
@@ -454,33 +618,76 @@ class AbletonBridge:
                         finished_bar = self.bar_index
                         self._on_bar_boundary(finished_bar)
                         # Update for next bar
-                        pulses_per_bar = self.clock_grid.get_pulses_per_bar()
                         self.bar_index += 1
-                        self.next_bar_boundary_pulse += pulses_per_bar
+                        self.next_bar_boundary_pulse += self.pulses_per_bar
+
+                # Speculative prefill of the bars collected so far
+                if (
+                    self.prefill_interval > 0
+                    and self.phase == self.PHASE_HUMAN
+                    and self.pending_ai_job is None
+                    and self.anchor_pulse is not None
+                    and time.monotonic() - last_prefill >= self.prefill_interval
+                ):
+                    last_prefill = time.monotonic()
+                    self._queue_speculative_prefill()
 
                 # Failsafe check
                 now = time.time()
                 if (now - last_failsafe_check > 6.0) and self.anchor_pulse is not None:
-                    all_msgs = self.midi_buffer.get_messages()
-                    has_notes = any(m.msg_type == 'note_on' and m.velocity > 0 for m in all_msgs)
-                    if has_notes and not self.failsafe_forced:
+                    note_ons = self.note_on_count
+                    has_notes = note_ons > note_ons_at_check
+                    note_ons_at_check = note_ons
+                    stalled = now - self.last_generation_time > 6.0
+                    if has_notes and stalled and not self.failsafe_forced:
                         logger.warning(f"[FAILSAFE] No generation in 6s despite human input.")
                         self.failsafe_forced = True
                     last_failsafe_check = now
 
-                time.sleep(0.01)  # Check 100 times per second
+                # Wake on the next clock pulse rather than polling; the timeout
+                # keeps prefill/failsafe/response checks going while stopped
+                grid = self.clock_grid
+                if grid is not None:
+                    grid.pulse_event.wait(timeout=0.1)
+                    grid.pulse_event.clear()
+                else:
+                    time.sleep(0.01)
         except Exception as e:
             logger.exception(f"Generation loop error: {e}")
 
+    def _queue_speculative_prefill(self):
+        """
+        Queue a prefill-only job for the prompt collected so far.
+
+        The generation prompt for this phase will start with the same events,
+        so by the time the last bar closes the worker only has to prefill the
+        newest tokens. Skipped when the worker is busy or nothing new arrived.
+        """
+        if len(self.gen_job_queue):
+            return
+
+        prompt_events = []
+        for i in range(self.bar_index - self.bars_collected_in_phase, self.bar_index + 1):
+            prompt_events.extend(self.human_bar_buffers.get(i, ()))
+        signature = (self.bar_index, len(prompt_events))
+        if not prompt_events or signature == self._prefill_signature:
+            return
+        self._prefill_signature = signature
+
+        job = GenerationJob(
+            bar_index=self.bar_index,
+            prompt_events=prompt_events,
+            aria_engine=self.aria_engine,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            gen_bars=0,
+            prefill_only=True,
+        )
+        self.gen_job_queue.push(job)
+
     def _has_human_activity(self) -> bool:
-        """Check if there's any human activity (note_on or CC changes) in the buffer."""
-        messages = self.midi_buffer.get_messages()
-        for msg in messages:
-            # Human activity: note_on with vel>0 or sustain pedal
-            if (msg.msg_type == 'note_on' and msg.velocity and msg.velocity > 0) or \
-               (msg.msg_type == 'control_change' and msg.control == 64):
-                return True
-        return False
+        """Check if there's been human activity (note_on with vel>0 or sustain) this cycle."""
+        return self.human_activity
 
     def _trigger_generation(self):
         """Snapshot buffer and queue generation."""
@@ -493,28 +700,25 @@ class AbletonBridge:
             self.skip_count += 1
 
     def _output_loop(self):
-        """Send queued MIDI files with precise timing using mido.play()."""
+        """Send pulse-scheduled model messages (and legacy MIDI-file events) to the output port."""
         logger.info("Output thread started")
+        promote_current_thread(self.out_rt_prio, self.out_rt_core)
         try:
-            import mido
-
             while self.running:
                 try:
-                    try:
-                        msg_type, msg_data = self.event_queue.get(timeout=0.05)
-                    except queue.Empty:
-                        msg_type = None
-
-                    if msg_type == 'midi_file':
-                        midi_path = msg_data
-                        # When a midi_file event arrives from legacy path, play immediately
-                        self._play_midi_file_with_timing(midi_path)
+                    event = self.event_queue.pop()
+                    if event is not None:
+                        msg_type, msg_data = event
+                        if msg_type == 'midi_file':
+                            # When a midi_file event arrives from legacy path, play immediately
+                            self._play_midi_file_with_timing(msg_data)
 
                     # Also service scheduled model messages (pulse-scheduled)
                     self._service_scheduled_messages()
 
-                except queue.Empty:
-                    pass
+                    # Pace the non-blocking loop (~0.5ms) instead of parking in a queue get
+                    time.sleep(0.0005)
+
                 except Exception as e:
                     logger.exception(f"Output error: {e}")
 
@@ -529,37 +733,43 @@ class AbletonBridge:
         if not self.clock_grid:
             return
 
-        current_pulse = self.clock_grid.get_pulse_count()
+        intake = self._schedule_intake
+        while not intake.empty():
+            replace, entries = intake.get_nowait()
+            if replace:
+                self.scheduled_heap = entries
+            else:
+                for entry in entries:
+                    heapq.heappush(self.scheduled_heap, entry)
 
-        to_send = []
-        with self.scheduled_lock:
-            remaining = []
-            for target_pulse, msg in self.scheduled_messages:
-                if current_pulse >= target_pulse:
-                    to_send.append((target_pulse, msg))
-                else:
-                    remaining.append((target_pulse, msg))
-            self.scheduled_messages = remaining
+        current_pulse = self.clock_grid.get_pulse_count()
 
-        # Send messages due (one-shot: removed from queue immediately after)
-        for tp, msg in to_send:
-            try:
-                self.out_port.send(msg)
-                logger.debug(f"OUT scheduled: {msg.type} target_pulse={tp} now={current_pulse}")
-            except Exception:
-                logger.exception("Failed to send scheduled message")
+        # Pop, send and log each due message in one pass (one-shot: it leaves
+        # the heap before it is sent). Messages are already raw bytes and idle
+        # ticks only peek at the heap head, so nothing is allocated here.
+        heap = self.scheduled_heap
+        if heap and heap[0][0] <= current_pulse:
+            send = self.out_port.send_message
+            while heap and heap[0][0] <= current_pulse:
+                tp, _, raw = heapq.heappop(heap)
+                try:
+                    send(raw)
+                except Exception:
+                    logger.exception("Failed to send scheduled message")
+                is_note = raw[0] & 0xE0 == 0x80
+                rtlog.push(LOG_OUT_SCHEDULED, raw[1] if is_note else -1, raw[2] if is_note else -1, tp, current_pulse)
 
         # If model end pulse reached, switch back to HUMAN and clear buffers
         if self.model_end_pulse is not None and current_pulse >= self.model_end_pulse:
             if self.phase == self.PHASE_AI_PLAY:
-                queue_size = len(self.scheduled_messages)
+                queue_size = len(self.scheduled_heap)
                 logger.info(f"[phase] AI_PLAY -> HUMAN at pulse={current_pulse}, playback finished, queue_size={queue_size}")
                 if queue_size > 0:
                     logger.warning(f"[service] {queue_size} events still queued, clearing.")
-                    with self.scheduled_lock:
-                        self.scheduled_messages.clear()
+                    self.scheduled_heap.clear()
                 # Clear human buffers for next cycle
                 self.human_bar_buffers.clear()
+                self.human_activity = False
                 logger.debug("[service] Cleared human_bar_buffers for next cycle")
                 # Reset bars collected counter for next collection phase
                 self.bars_collected_in_phase = 0
@@ -622,11 +832,16 @@ class AbletonBridge:
                     temperature=self.temperature,
                     top_p=self.top_p,
                     gen_bars=self.gen_measures,  # Generate M measures per cycle
+                    ticks_per_beat=self.ticks_per_beat,
                 )
+                if not self.gen_job_queue.push(job):
+                    logger.warning(f"[enqueue] Generation queue full, dropping job for bar {finished_bar}")
+                    self.bars_collected_in_phase = 0
+                    return
                 self.pending_ai_job = job
-                self.gen_job_queue.put(job)
                 logger.info(f"[enqueue] {self.gen_measures}-measure generation job for bar {finished_bar} queued (after {self.human_measures}-bar collection)")
                 self.last_generation_time = time.time()
+                self.failsafe_forced = False  # Re-arm the failsafe warning
                 self.generation_count += 1
                 
                 # Reset counter for next collection phase
@@ -634,7 +849,7 @@ class AbletonBridge:
 
             elif self.phase == self.PHASE_AI_PLAY:
                 # Block new generation while AI is playing
-                logger.debug(f"[bar_boundary] In PHASE_AI_PLAY, skipping generation trigger")
+                logger.debug("[bar_boundary] In PHASE_AI_PLAY, skipping generation trigger")
 
         except Exception as e:
             logger.exception(f"Error on bar boundary: {e}")
@@ -644,10 +859,10 @@ class AbletonBridge:
         Check if the pending AI job has finished generation.
         If ready, schedule the N-measure response and switch to PHASE_AI_PLAY.
         """
-        if self.pending_ai_job is None or self.pending_ai_job.result_midi_path is None:
+        if self.pending_ai_job is None or self.pending_ai_job.result_events is None:
             return  # Not ready yet
 
-        midi_path = self.pending_ai_job.result_midi_path
+        events = self.pending_ai_job.result_events
         job_bar = self.pending_ai_job.bar_index
         
         logger.info(f"[ai_ready] {self.gen_measures}-measure response ready for job at bar {job_bar}, scheduling playback")
@@ -658,10 +873,10 @@ class AbletonBridge:
             return
         
         boundary_pulse = self.clock_grid.get_pulse_count()
-        pulses_per_bar = self.clock_grid.get_pulses_per_bar()
+        pulses_per_bar = self.pulses_per_bar
         
         # Schedule the N-measure playback
-        self._schedule_two_bar_response(midi_path, boundary_pulse, pulses_per_bar)
+        self._schedule_two_bar_response(events, boundary_pulse, pulses_per_bar)
         
         # Switch phase
         self.phase = self.PHASE_AI_PLAY
@@ -669,9 +884,9 @@ class AbletonBridge:
         
         logger.info(f"[phase] HUMAN -> AI_PLAY at pulse={boundary_pulse}")
 
-    def _schedule_two_bar_response(self, midi_path: str, boundary_pulse: int, pulses_per_bar: int):
+    def _schedule_two_bar_response(self, events: np.ndarray, boundary_pulse: int, pulses_per_bar: int):
         """
-        Schedule an N-measure AI response for playback.
+        Schedule an N-measure AI response (parsed by load_pulse_events) for playback.
         
         Enforces strict N-measure limit:
         - Keep only events with 0 <= offset_pulse < N*pulses_per_bar
@@ -679,69 +894,46 @@ class AbletonBridge:
         - Send CC123 at end
         """
         try:
-            import mido
-            
             max_offset_pulses = self.gen_measures * pulses_per_bar  # N measures in pulses
             
-            mid = mido.MidiFile(midi_path)
-            tpq = mid.ticks_per_beat if mid.ticks_per_beat else self.ticks_per_beat
+            # **ENFORCE N-measure limit**: Discard events beyond boundary
+            keep = events['offset'] < max_offset_pulses
+            if not keep.all():
+                logger.debug("[schedule_2bar] Discarding %d events at offset >= limit %d", len(keep) - int(keep.sum()), max_offset_pulses)
+                events = events[keep]
             
             messages = []
-            active_notes = {}  # {pitch: velocity} for unclosed notes
-            abs_tick = 0
-            
-            # Parse MIDI and apply N-measure limit
-            for track in mid.tracks:
-                abs_tick = 0
-                for msg in track:
-                    abs_tick += msg.time
-                    if not hasattr(msg, 'type'):
-                        continue
-                    
-                    # Compute offset in pulses
-                    offset_pulses = int((abs_tick / float(tpq)) * 24.0)
-                    
-                    # **ENFORCE N-measure limit**: Discard events beyond boundary
-                    if offset_pulses >= max_offset_pulses:
-                        logger.debug(f"[schedule_2bar] Discarding event at offset={offset_pulses} (>= limit {max_offset_pulses})")
-                        continue
-                    
-                    target_pulse = boundary_pulse + offset_pulses
-                    
-                    if msg.type == 'note_on' and msg.velocity > 0:
-                        active_notes[msg.note] = msg.velocity
-                        messages.append((target_pulse, msg.copy()))
-                    
-                    elif msg.type == 'note_off' or (msg.type == 'note_on' and msg.velocity == 0):
-                        if msg.note in active_notes:
-                            del active_notes[msg.note]
-                        messages.append((target_pulse, msg.copy()))
-                    
-                    elif msg.type == 'control_change':
-                        messages.append((target_pulse, msg.copy()))
+            active_notes = 0  # Bitmap of unclosed pitches (bit p = pitch p)
+            for offset, status, data1, data2 in events.tolist():
+                kind = status & 0xF0
+                if kind == NOTE_ON and data2 > 0:
+                    active_notes |= 1 << data1
+                elif kind == NOTE_OFF or kind == NOTE_ON:
+                    active_notes &= ~(1 << data1)
+                messages.append((boundary_pulse + offset, [status, data1, data2]))
             
             # **ENFORCE**: Force note-offs for unclosed notes at N-measure end
             end_pulse = boundary_pulse + max_offset_pulses
-            for pitch in list(active_notes.keys()):
-                note_off = mido.Message('note_off', note=pitch, velocity=0)
-                messages.append((end_pulse, note_off))
-                logger.debug(f"[schedule_2bar] Forced note_off for pitch {pitch} at {self.gen_measures}-measure end")
+            while active_notes:
+                lowest = active_notes & -active_notes
+                active_notes ^= lowest
+                pitch = lowest.bit_length() - 1
+                messages.append((end_pulse, [NOTE_OFF, pitch, 0]))
+                logger.debug("[schedule_2bar] Forced note_off for pitch %d at %d-measure end", pitch, self.gen_measures)
             
-            # Send CC123 at end
-            all_notes_off = mido.Message('control_change', control=123, value=0)
-            messages.append((end_pulse, all_notes_off))
+            # Send CC123 (all notes off) at end
+            messages.append((end_pulse, [CONTROL_CHANGE, 123, 0]))
             
-            # Sort by target_pulse
-            messages.sort(key=lambda x: x[0])
+            # Already in pulse order: events are sorted and end_pulse is last
             
             # Clear old events and schedule new ones
-            queue_size_before = len(self.scheduled_messages)
+            queue_size_before = len(self.scheduled_heap)
             if queue_size_before > 0:
                 logger.warning(f"[schedule_2bar] Clearing {queue_size_before} old scheduled events before new response")
             
-            with self.scheduled_lock:
-                self.scheduled_messages.clear()
-                self.scheduled_messages.extend(messages)
+            # Sorted by (pulse, seq), so the list is already a valid heap
+            heap = [(tp, next(self._schedule_seq), msg) for tp, msg in messages]
+            self._schedule_intake.put_nowait((True, heap))
             
             # Set model end pulse
             self.model_end_pulse = end_pulse
@@ -754,129 +946,95 @@ class AbletonBridge:
                     f"[schedule_2bar] {self.gen_measures}-measure response: {len(messages)} events in pulse [{boundary_pulse}..{end_pulse}), "
                     f"min={pulse_min} max={pulse_max}"
                 )
-            
-            # Cleanup temp MIDI
-            try:
-                os.unlink(midi_path)
-            except Exception:
-                pass
         
         except Exception as e:
             logger.exception(f"Failed to schedule {self.gen_measures}-measure response: {e}")
 
-    def _try_schedule_ready_bar(self, current_bar: int):
-        """DEPRECATED: use _check_and_schedule_ai_response for MVP"""
-        pass
-
-    def _schedule_single_bar_playback(self, bar_index: int, midi_path: str, boundary_pulse: int):
-        """DEPRECATED: use _schedule_two_bar_response for MVP"""
-        pass
-
-    def _on_block_boundary(self, boundary_pulse: int):
-        """Legacy handler - not used in pipelined mode. Kept for compatibility."""
-        logger.debug(f"[_on_block_boundary] called but pipelined mode uses _on_bar_boundary")
-        pass
-
     def _schedule_generated_midi(self, midi_path: str, boundary_pulse: int):
         """Convert generated MIDI file into pulse-scheduled messages and enqueue them.
         boundary_pulse is the pulse index at which the model should start playing (i.e., immediate next pulse).
         """
         try:
-            import mido
-
-            mid = mido.MidiFile(midi_path)
-            tpq = mid.ticks_per_beat if mid.ticks_per_beat else self.ticks_per_beat
+            events = load_pulse_events(midi_path, self.ticks_per_beat)
+            offsets = events['offset']
+            if self.quantize:
+                # Snap to the nearest 1/16 (6 pulses at 24 PPQN)
+                offsets = (offsets + 3) // 6 * 6
+            targets = (offsets + boundary_pulse).tolist()
+            messages = [
+                (target_pulse, [status, data1, data2])
+                for target_pulse, status, data1, data2 in zip(
+                    targets, events['status'].tolist(), events['data1'].tolist(), events['data2'].tolist()
+                )
+            ]
 
-            abs_tick = 0
-            messages = []
-            for track in mid.tracks:
-                abs_tick = 0
-                for msg in track:
-                    abs_tick += msg.time
-                    if not hasattr(msg, 'type'):
-                        continue
-                    if msg.type in ('note_on', 'note_off', 'control_change'):
-                        # Convert tick -> pulse: pulse_delta = (tick / ticks_per_beat) * 24
-                        pulse_delta = int((abs_tick / float(tpq)) * 24.0)
-                        target_pulse = boundary_pulse + pulse_delta
-                        messages.append((target_pulse, msg.copy()))
-
-            # Merge into scheduled_messages list (thread-safe)
-            with self.scheduled_lock:
-                self.scheduled_messages.extend(messages)
+            # Merge into the scheduled heap (the output thread pushes them)
+            self._schedule_intake.put_nowait(
+                (False, [(target_pulse, next(self._schedule_seq), raw) for target_pulse, raw in messages])
+            )
 
             # Set model end pulse
             pulses_per_block = self.clock_grid.get_pulses_per_block()
             self.model_end_pulse = boundary_pulse + pulses_per_block
 
             # Cleanup generated midi file
-            try:
+            with contextlib.suppress(OSError):
                 os.unlink(midi_path)
-            except Exception:
-                pass
 
             logger.info(f"[schedule] Scheduled {len(messages)} generated events starting at pulse={boundary_pulse}")
 
         except Exception as e:
             logger.exception(f"Failed to schedule generated MIDI: {e}")
 
-    def _parse_generated_midi_for_bar(self, bar_index: int, midi_path: str):
-        """Parse generated MIDI and store for bar playback."""
-        try:
-            import mido
-            mid = mido.MidiFile(midi_path)
-            messages = []
-            for track in mid.tracks:
-                for msg in track:
-                    if hasattr(msg, 'type') and msg.type in ('note_on', 'note_off', 'control_change'):
-                        messages.append(msg.copy())
-            self.generated_bar_queue[bar_index] = messages
-            logger.info(f"[parse] Bar {bar_index}: {len(messages)} messages stored")
-        except Exception as e:
-            logger.exception(f"Failed to parse generated MIDI for bar {bar_index}: {e}")
+    def _play_midi_file_with_timing(self, midi_path: str):
+        """Load and play a MIDI file with proper timing to output port.
 
-    def _schedule_2bar_playback(self, bar1: int, bar2: int):
-        """DEPRECATED: Legacy 2-bar scheduling. Use _schedule_single_bar_playback instead.
-        
-        Kept for reference; not called in pipelined mode.
+        With a running clock the file is handed to the pulse scheduler, so the
+        output thread never sleeps; the sleep-timed loop below is the
+        clockless fallback.
         """
-        logger.debug(f"[_schedule_2bar_playback] DEPRECATED - called for bars {bar1}-{bar2} (ignored)")
-        pass
-    
-    def _play_midi_file_with_timing(self, midi_path: str):
-        """Load and play a MIDI file with proper timing to output port."""
+        if self.clock_grid and self.clock_grid.get_is_running():
+            self._schedule_generated_midi(midi_path, boundary_pulse=self.clock_grid.get_pulse_count())
+            return
+
         try:
-            import mido
-            
             mid = mido.MidiFile(midi_path)
             total_time = mid.length
             msg_count = 0
-            
-            # Use mid.play() to iterate through messages with absolute timing
-            for msg in mid.play():
+
+            # Iterating the file (not mid.play(), which sleeps itself) gives
+            # delta times in seconds; collect channel messages and their
+            # absolute times so timing is computed in one vectorized pass
+            raws = []  # Encoded up front to keep the timing loop tight
+            abs_times = []
+            t = 0.0
+            for msg in mid:
+                t += msg.time
+                if msg.type in CHANNEL_MSG_TYPES:
+                    raws.append(msg.bytes())
+                    abs_times.append(t)
+            abs_times = np.asarray(abs_times, dtype=np.float64)
+
+            # Optionally snap absolute times to the 1/16 grid
+            if self.quantize and self.tempo_tracker and raws:
+                bpm = self.tempo_tracker.get_bpm()
+                inv_sixteenth = 4.0 * bpm / 60.0
+                abs_times = np.rint(abs_times * inv_sixteenth) / inv_sixteenth
+
+            # Wait for absolute deadlines from one start time so sleep jitter
+            # doesn't accumulate; sleep to ~0.5 ms short, then spin
+            start = time.monotonic()
+            for raw, t in zip(raws, abs_times.tolist()):
                 if not self.running:
                     break
-                    
-                # Filter out meta messages, only send channel messages
-                if msg.type in ('note_on', 'note_off', 'control_change'):
-                    # Sleep for the message's elapsed time
-                    msg_time = msg.time
-                    
-                    # Optionally quantize to 1/16 grid
-                    if self.quantize and self.tempo_tracker:
-                        bpm = self.tempo_tracker.get_bpm()
-                        # Sixteenth note duration in seconds
-                        sixteenth_dur = (60.0 / bpm) / 4.0
-                        # Quantize to nearest sixteenth
-                        quantized_time = round(msg_time / sixteenth_dur) * sixteenth_dur
-                        msg_time = max(0, quantized_time)
-                    
-                    if msg_time > 0:
-                        time.sleep(msg_time)
-                    
-                    self.out_port.send(msg)
-                    msg_count += 1
-                    logger.debug(f"OUT: {msg.type} (t={msg.time:.3f}s)")
+                deadline = start + t
+                remaining = deadline - time.monotonic()
+                if remaining > 0.001:
+                    time.sleep(remaining - 0.0005)
+                while time.monotonic() < deadline:
+                    pass
+                self.out_port.send_message(raw)
+                msg_count += 1
             
             logger.info(f"Sent {msg_count} MIDI messages in {total_time:.2f}s")
             
@@ -884,7 +1042,5 @@ class AbletonBridge:
             logger.error(f"Failed to play MIDI file {midi_path}: {e}")
         finally:
             # Cleanup temp file after playback
-            try:
+            with contextlib.suppress(OSError):
                 os.unlink(midi_path)
-            except:
-                pass
@@ -21,6 +21,13 @@ class AriaEngine:
         checkpoint_path: str,
         device: str = "cuda",
         config_name: str = "medium",
+        precision: str = "fp32",
+        temperature: float = 0.8,
+        top_p: float = 0.9,
+        cuda_graph: bool = True,
+        max_seq_len: int = 2048,
+        num_candidates: int = 1,
+        compile: bool = False,
     ):
         """
         Load the Aria model once at initialization.
@@ -29,15 +36,33 @@ class AriaEngine:
             checkpoint_path: Path to .safetensors checkpoint
             device: 'cuda' or 'cpu' (use cuda for real-time)
             config_name: Model config name (e.g., 'medium', 'large')
+            precision: Weight precision: 'fp32' or 'bf16'
+            temperature: Sampling temperature baked into the CUDA graph
+            top_p: Top-p baked into the CUDA graph
+            cuda_graph: Capture the decode step as a CUDA graph (cuda only)
+            max_seq_len: Fixed KV-cache length (prompt + new tokens) for the graph
+            num_candidates: Continuations sampled per call in one batch (graph
+                path only); the highest mean log-prob candidate is returned
+            compile: torch.compile the decode step, during graph capture or,
+                without the CUDA graph, in a short warm-up run here
         """
         self.checkpoint_path = checkpoint_path
         self.device = device
         self.config_name = config_name
+        self.precision = precision
         self.model = None
         self.tokenizer = None
         self.dtype = None
+        self.num_candidates = max(1, num_candidates)
+        self.compile = compile
+        self.decoder = None  # CUDAGraphDecoder when cuda_graph is enabled
+        self.stream = None  # Dedicated CUDA stream for graph decoding
 
         self._load_model()
+        if cuda_graph and device == "cuda":
+            self._setup_cuda_graph(temperature, top_p, max_seq_len)
+        if self.compile and self.decoder is None:
+            self._warm_eager_compile(temperature, top_p)
         logger.info(
             f"AriaEngine initialized: {config_name} on {device}, "
             f"checkpoint={os.path.basename(checkpoint_path)}"
@@ -68,12 +93,17 @@ class AriaEngine:
         try:
             model_config = ModelConfig(**load_model_config(name=self.config_name))
             model_config.set_vocab_size(AbsTokenizer().vocab_size)
-            self.model = TransformerLM(model_config)
+            # Allocate parameters on the target device directly, and let
+            # safetensors mmap the file and load tensors straight there,
+            # instead of building on CPU and copying the whole model over
+            with torch.device(self.device):
+                self.model = TransformerLM(model_config)
 
-            state_dict = load_file(filename=self.checkpoint_path)
+            state_dict = load_file(filename=self.checkpoint_path, device=self.device)
             self.model.load_state_dict(state_dict=state_dict, strict=False)
-            self.model = self.model.to(self.device)
+            del state_dict
             self.model.eval()
+            self._apply_precision()
 
             self.tokenizer = AbsTokenizer()
 
@@ -86,43 +116,136 @@ class AriaEngine:
             logger.error(f"Failed to load model: {e}")
             raise
 
+    def _apply_precision(self) -> None:
+        """Cast the loaded weights according to self.precision."""
+        if self.precision == "bf16":
+            self.model = self.model.to(torch.bfloat16)
+        elif self.precision != "fp32":
+            raise ValueError(f"Unknown precision: {self.precision}")
+        logger.info(f"Model weights: {self.precision}")
+
+    def _setup_cuda_graph(self, temperature: float, top_p: float, max_seq_len: int) -> None:
+        """Capture the decode step once; falls back to eager sampling on failure."""
+        try:
+            from aria.inference.sample_cuda import CUDAGraphDecoder
+
+            start_time = time.time()
+            self.decoder = CUDAGraphDecoder(
+                model=self.model,
+                batch_size=self.num_candidates,
+                max_seq_len=max_seq_len,
+                temp=temperature,
+                top_p=top_p,
+                compile=self.compile,
+            )
+            # Run generation on its own stream so it never queues behind
+            # unrelated work on the default stream
+            self.stream = torch.cuda.Stream()
+            self.stream.wait_stream(torch.cuda.current_stream())
+            logger.info(
+                f"CUDA graph captured in {time.time() - start_time:.2f}s "
+                f"(max_seq_len={max_seq_len}, candidates={self.num_candidates}, "
+                f"temp={temperature}, top_p={top_p}, "
+                f"compile={self.compile})"
+            )
+        except Exception as e:
+            logger.warning(f"CUDA graph capture failed, using eager sampling: {e}")
+            self.decoder = None
+            self.stream = None
+
+    def _warm_eager_compile(self, temperature: float, top_p: float) -> None:
+        """Compile the eager decode step now rather than on the first generate()."""
+        try:
+            from aria.inference.sample_cuda import sample_batch
+
+            start_time = time.time()
+            with torch.inference_mode():
+                sample_batch(
+                    model=self.model,
+                    tokenizer=self.tokenizer,
+                    prompt=[("prefix", "instrument", "piano"), self.tokenizer.bos_tok],
+                    num_variations=1,
+                    max_new_tokens=8,
+                    temp=temperature,
+                    force_end=False,
+                    top_p=top_p,
+                    compile=True,
+                )
+            logger.info(f"Eager decode step compiled in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            logger.warning(f"Eager compile warm-up failed: {e}")
+        # sample_batch compiles decode_one module-wide; never again
+        self.compile = False
+
+    def _load_prompt(self, prompt_midi, prompt_duration_s: int) -> list:
+        """Tokenize the inference prompt from a MIDI file path or mido.MidiFile."""
+        from aria.inference import get_inference_prompt
+        from ariautils.midi import MidiDict, midi_to_dict
+
+        if isinstance(prompt_midi, (str, os.PathLike)):
+            midi_dict = MidiDict.from_midi(prompt_midi)
+        else:
+            midi_dict = MidiDict(**midi_to_dict(prompt_midi))
+        return get_inference_prompt(
+            midi_dict=midi_dict,
+            tokenizer=self.tokenizer,
+            prompt_len_ms=int(1e3 * prompt_duration_s),
+        )
+
+    def prefill(self, prompt_midi, prompt_duration_s: int = 4) -> int:
+        """
+        Speculatively extend the decoder's KV cache with a partial prompt
+        (a .mid path or an in-memory mido.MidiFile).
+
+        A later generate() whose prompt starts with the same tokens only runs
+        the new suffix. No-op without the CUDA graph decoder.
+
+        Returns:
+            Number of tokens prefilled.
+        """
+        if self.decoder is None:
+            return 0
+        try:
+            prompt = self._load_prompt(prompt_midi, prompt_duration_s)
+            with torch.cuda.stream(self.stream):
+                return self.decoder.prefill(tokenizer=self.tokenizer, prompt=prompt)
+        except Exception as e:
+            logger.warning(f"Speculative prefill failed: {e}")
+            return 0
+
     def generate(
         self,
-        prompt_midi_path: str,
+        prompt_midi,
         prompt_duration_s: int = 4,
         horizon_s: float = 0.6,
         temperature: float = 0.8,
         top_p: Optional[float] = 0.9,
         min_p: Optional[float] = None,
         max_new_tokens: Optional[int] = None,
-    ) -> str:
+        return_midi: bool = False,
+    ):
         """
         Generate continuation from a prompt MIDI file.
 
         Args:
-            prompt_midi_path: Path to .mid file
+            prompt_midi: Path to .mid file, or an in-memory mido.MidiFile
             prompt_duration_s: How many seconds of prompt to use
             horizon_s: How many seconds to generate (~0.6s for MVP)
             temperature: Sampling temperature (0.8 default = conservative)
             top_p: Top-p sampling (0.9 default = conservative)
             min_p: Min-p sampling (alternative to top_p)
             max_new_tokens: Max tokens to generate (auto-set if None)
+            return_midi: Return the mido.MidiFile itself instead of saving it
 
         Returns:
-            Path to the generated MIDI file (temporary file, caller must clean up).
+            Path to the generated MIDI file (temporary file, caller must clean up),
+            or the mido.MidiFile when return_midi is set.
         """
         try:
-            from aria.inference import get_inference_prompt
             from aria.inference.sample_cuda import sample_batch
-            from ariautils.midi import MidiDict
 
             # Get and tokenize prompt
-            midi_dict = MidiDict.from_midi(prompt_midi_path)
-            prompt = get_inference_prompt(
-                midi_dict=midi_dict,
-                tokenizer=self.tokenizer,
-                prompt_len_ms=int(1e3 * prompt_duration_s),
-            )
+            prompt = self._load_prompt(prompt_midi, prompt_duration_s)
 
             # Estimate tokens for horizon:
             # Aria typically generates ~0.5-1 token/ms at 0.6s = 600ms
@@ -142,38 +265,55 @@ class AriaEngine:
                 f"max_new_tokens={max_new_tokens}, temp={temperature}, top_p={top_p}"
             )
 
-            # Sample
+            # Sample: replay the captured graph when the request matches it
             start_time = time.time()
-            with torch.inference_mode():
-                results = sample_batch(
-                    model=self.model,
-                    tokenizer=self.tokenizer,
-                    prompt=prompt,
-                    num_variations=1,
-                    max_new_tokens=max_new_tokens,
-                    temp=temperature,
-                    force_end=False,
-                    top_p=top_p,
-                    min_p=min_p,
-                    compile=False,
-                )
+            decoder = self.decoder
+            if (
+                decoder is not None
+                and min_p is None
+                and temperature == decoder.temp
+                and top_p == decoder.top_p
+                and len(prompt) + max_new_tokens <= decoder.max_seq_len
+            ):
+                with torch.cuda.stream(self.stream):
+                    results = decoder.generate(
+                        tokenizer=self.tokenizer,
+                        prompt=prompt,
+                        max_new_tokens=max_new_tokens,
+                    )
+            else:
+                with torch.inference_mode():
+                    results = sample_batch(
+                        model=self.model,
+                        tokenizer=self.tokenizer,
+                        prompt=prompt,
+                        num_variations=1,
+                        max_new_tokens=max_new_tokens,
+                        temp=temperature,
+                        force_end=False,
+                        top_p=top_p,
+                        min_p=min_p,
+                    )
 
             gen_time = time.time() - start_time
             logger.debug(f"Generation took {gen_time:.2f}s, produced {len(results[0])} tokens")
 
-            # Detokenize to MIDI dict and save to temp file
+            # Detokenize to MIDI dict and save to temp file (results are
+            # ranked best-first when several candidates were sampled)
             if results:
                 tokenized_seq = results[0]
                 midi_dict = self.tokenizer.detokenize(tokenized_seq)
                 midi_obj = midi_dict.to_midi()
+                if return_midi:
+                    return midi_obj
 
-                # Save to temp file
-                tmp = tempfile.NamedTemporaryFile(suffix='.mid', delete=False)
-                tmp.close()
-                midi_obj.save(tmp.name)
+                # Save to temp file through the descriptor mkstemp() opened
+                fd, path = tempfile.mkstemp(suffix='.mid')
+                with os.fdopen(fd, 'wb') as f:
+                    midi_obj.save(file=f)
                 
-                logger.debug(f"Generated MIDI saved to {tmp.name}")
-                return tmp.name
+                logger.debug(f"Generated MIDI saved to {path}")
+                return path
             else:
                 return None
 
@@ -15,15 +15,35 @@ Usage:
 import logging
 import threading
 import time
-from typing import Callable, List, Optional
+from typing import Callable, List
 
 logger = logging.getLogger(__name__)
 
 PPQN = 24  # MIDI clock pulses per quarter note
 
+# Port enumeration is a blocking driver call; reuse it across quick
+# start/stop cycles
+_PORTS_TTL = 2.0
+_ports_cache = {'t': 0.0, 'names': None}
+
+
+def _input_names(refresh: bool = False) -> List[str]:
+    import mido
+    now = time.monotonic()
+    if refresh or _ports_cache['names'] is None or now - _ports_cache['t'] >= _PORTS_TTL:
+        _ports_cache['names'] = mido.get_input_names()
+        _ports_cache['t'] = now
+    return _ports_cache['names']
+
 
 class ClockGrid:
-    def __init__(self, clock_port_name: str = "ARIA_CLOCK", measures: int = 4, beats_per_bar: int = 4):
+    def __init__(self, clock_port_name: str = "ARIA_CLOCK", measures: int = 4, beats_per_bar: int = 4, shared_pulse=None):
+        """
+        Args:
+            shared_pulse: Optional multiprocessing Value('q') mirroring the
+                pulse count, so another process (the MIDI I/O process) can
+                stamp input without asking this one
+        """
         self.clock_port_name = clock_port_name
         self.measures = measures
         self.beats_per_bar = beats_per_bar
@@ -37,8 +57,13 @@ class ClockGrid:
         self.is_running = False  # MIDI transport running state (start/stop)
         self.pulse_count = 0
         self.last_clock_time = None
+        self.shared_pulse = shared_pulse
+        if shared_pulse is not None:
+            shared_pulse.value = 0
+        # Set on every pulse and transport change; a consumer waits on it and
+        # clears it before reading pulse_count
+        self.pulse_event = threading.Event()
 
-        self.thread: Optional[threading.Thread] = None
         self.boundary_callbacks: List[Callable[[int], None]] = []
         self.last_pulse_log_time = time.monotonic()
 
@@ -52,22 +77,22 @@ class ClockGrid:
         except Exception:
             raise ImportError("mido is required. Install with: pip install mido")
 
+        # Callback mode: the backend's input thread delivers each clock
+        # message as it arrives, instead of a thread polling every 1 ms
+        self.running = True
         try:
             port_name = self._resolve_port_name()
-            self.clock_port = mido.open_input(port_name)
+            self.clock_port = mido.open_input(port_name, callback=self._on_clock_msg)
             logger.info(f"ClockGrid: opened clock port {port_name}")
         except Exception as e:
+            self.running = False
             logger.error(f"ClockGrid: failed to open clock port '{self.clock_port_name}': {e}")
             raise
-
-        self.running = True
-        self.thread = threading.Thread(target=self._loop, daemon=True)
-        self.thread.start()
+        logger.info("ClockGrid: listening for MIDI clock messages")
 
     def stop(self):
         self.running = False
-        if self.thread:
-            self.thread.join(timeout=1.0)
+        self.pulse_event.set()
         if self.clock_port:
             try:
                 self.clock_port.close()
@@ -76,24 +101,24 @@ class ClockGrid:
             logger.info("ClockGrid: clock port closed")
 
     def _resolve_port_name(self) -> str:
-        import mido
-        avail = mido.get_input_names()
-        if self.clock_port_name in avail:
-            return self.clock_port_name
-        matched = [p for p in avail if p.startswith(self.clock_port_name)]
-        if matched:
-            return matched[0]
+        # A cached list may predate a just-created port, so re-probe on a miss
+        for refresh in (False, True):
+            avail = _input_names(refresh)
+            if self.clock_port_name in avail:
+                return self.clock_port_name
+            matched = [p for p in avail if p.startswith(self.clock_port_name)]
+            if matched:
+                return matched[0]
         return self.clock_port_name
 
-    def _loop(self):
-        logger.info("ClockGrid: listening for MIDI clock messages")
+    def _on_clock_msg(self, msg):
+        """Port callback; runs on the MIDI backend's input thread."""
+        if not self.running:
+            return
         try:
-            while self.running:
-                for msg in self.clock_port.iter_pending():
-                    self._handle_msg(msg)
-                time.sleep(0.001)
+            self._handle_msg(msg)
         except Exception as e:
-            logger.exception(f"ClockGrid loop error: {e}")
+            logger.exception(f"ClockGrid callback error: {e}")
 
     def _handle_msg(self, msg):
         # mido expresses clock messages with .type of 'start', 'stop', 'continue', 'clock'
@@ -101,6 +126,8 @@ class ClockGrid:
             with self.lock:
                 self.is_running = True
                 self.pulse_count = 0
+                if self.shared_pulse is not None:
+                    self.shared_pulse.value = 0
                 self.last_clock_time = None
                 logger.info("ClockGrid: MIDI START")
         elif msg.type == 'continue':
@@ -111,6 +138,7 @@ class ClockGrid:
             with self.lock:
                 self.is_running = False
                 logger.info("ClockGrid: MIDI STOP")
+            self.pulse_event.set()
         elif msg.type == 'clock':
             self._handle_pulse()
 
@@ -121,20 +149,27 @@ class ClockGrid:
 
         with self.lock:
             self.pulse_count += 1
+            pulse_count = self.pulse_count
+            if self.shared_pulse is not None:
+                self.shared_pulse.value = pulse_count
             self.last_clock_time = now
 
-            # Log pulse count once per second
-            if now - self.last_pulse_log_time >= 1.0:
-                logger.info(f"ClockGrid pulse update: count={self.pulse_count}, running={self.is_running}")
-                self.last_pulse_log_time = now
-
             # Detect block boundary when pulse_count is a multiple of pulses_per_block
-            if self.is_running and self.pulse_count % self.pulses_per_block == 0:
-                boundary_pulse = self.pulse_count
-                logger.info(f"ClockGrid: block boundary pulse={boundary_pulse} (measures={self.measures})")
+            if self.is_running and pulse_count % self.pulses_per_block == 0:
+                boundary_pulse = pulse_count
                 # Call callbacks without holding lock to avoid deadlocks
                 callbacks = list(self.boundary_callbacks)
 
+        self.pulse_event.set()
+
+        # Logging happens after the lock is released and the pulse published.
+        # Only this thread touches last_pulse_log_time.
+        if now - self.last_pulse_log_time >= 1.0:
+            logger.info("ClockGrid pulse update: count=%d, running=%s", pulse_count, self.is_running)
+            self.last_pulse_log_time = now
+        if boundary_pulse is not None:
+            logger.info("ClockGrid: block boundary pulse=%d (measures=%d)", boundary_pulse, self.measures)
+
         # invoke callbacks outside lock
         for cb in callbacks:
             try:
@@ -142,13 +177,13 @@ class ClockGrid:
             except Exception:
                 logger.exception("ClockGrid: boundary callback error")
 
+    # Single-attribute reads are atomic under the GIL and only the clock
+    # thread writes these, so the hot-path getters skip the lock
     def get_pulse_count(self) -> int:
-        with self.lock:
-            return int(self.pulse_count)
+        return self.pulse_count
 
     def get_is_running(self) -> bool:
-        with self.lock:
-            return bool(self.is_running)
+        return self.is_running
 
     def get_pulses_per_block(self) -> int:
         return int(self.pulses_per_block)
@@ -0,0 +1,120 @@
+"""Run AriaEngine in its own process.
+
+Tokenization, the sampling loop and MIDI decoding are pure Python and hold
+the GIL for most of a generation, which the input/output threads then wait
+on. With --gen_process the model lives in a spawned child instead, and the
+bridge talks to it through RemoteAriaEngine, which exposes the same
+prefill()/generate() calls. The calling thread (GenerationWorker) blocks in
+Connection.recv(), which releases the GIL, while the child works.
+
+Prompts and generated MIDI cross the pipe as pickled mido.MidiFile objects.
+The child is always asked for return_midi=True, so it never leaves temp
+files behind for the parent to clean up.
+"""
+
+import logging
+import multiprocessing
+import threading
+
+try:
+    from .aria_engine import AriaEngine
+except ImportError:
+    from aria_engine import AriaEngine
+
+logger = logging.getLogger(__name__)
+
+
+def _serve(conn, engine_kwargs: dict) -> None:
+    """Process entry point: own an AriaEngine and answer calls from the pipe."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(levelname)s %(asctime)s] %(name)s: %(message)s',
+        datefmt='%H:%M:%S',
+    )
+    try:
+        engine = AriaEngine(**engine_kwargs)
+    except Exception as e:
+        logger.exception(f"Generation process failed to load the model: {e}")
+        conn.send((False, repr(e)))
+        return
+    conn.send((True, None))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        method, kwargs = request
+        try:
+            conn.send((True, getattr(engine, method)(**kwargs)))
+        except Exception as e:
+            conn.send((False, repr(e)))
+
+
+class RemoteAriaEngine:
+    """
+    AriaEngine proxy backed by a spawned process.
+
+    Construction blocks until the child has loaded the model, so load errors
+    surface at startup like they do in-process.
+    """
+
+    def __init__(self, **engine_kwargs):
+        """
+        Args:
+            **engine_kwargs: Passed to AriaEngine(...) in the child process.
+        """
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._lock = threading.Lock()  # One call in flight at a time
+        self.process = ctx.Process(
+            target=_serve,
+            args=(child_conn, engine_kwargs),
+            name="aria-gen",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        ok, error = self._conn.recv()
+        if not ok:
+            self.process.join(timeout=2)
+            raise RuntimeError(f"Generation process failed to start: {error}")
+        logger.info(f"Generation process ready (pid={self.process.pid})")
+
+    def _call(self, method: str, **kwargs):
+        with self._lock:
+            self._conn.send((method, kwargs))
+            ok, result = self._conn.recv()
+        if not ok:
+            raise RuntimeError(f"{method} failed in generation process: {result}")
+        return result
+
+    def prefill(self, prompt_midi, prompt_duration_s: int = 4) -> int:
+        """See AriaEngine.prefill."""
+        return self._call("prefill", prompt_midi=prompt_midi, prompt_duration_s=prompt_duration_s)
+
+    def generate(self, prompt_midi, **kwargs):
+        """
+        See AriaEngine.generate. Always returns the generated mido.MidiFile
+        (or None), whatever return_midi says.
+        """
+        kwargs["return_midi"] = True
+        return self._call("generate", prompt_midi=prompt_midi, **kwargs)
+
+    def close(self) -> None:
+        """Stop the child process."""
+        # A generation still in flight owns the pipe; don't wait on it forever
+        if self._lock.acquire(timeout=5):
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+            finally:
+                self._lock.release()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._conn.close()
@@ -1,13 +1,13 @@
-"""Thread-safe rolling buffer of timestamped MIDI messages."""
+"""Lock-free rolling buffer of timestamped MIDI messages."""
 
-import threading
 import time
-from collections import deque
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class TimestampedMidiMsg:
     """A MIDI message with its reception timestamp."""
     msg_type: str  # 'note_on', 'note_off', 'control_change'
@@ -19,62 +19,171 @@ class TimestampedMidiMsg:
     pulse: Optional[int] = None  # MIDI clock pulse index (24ppqn)
 
 
+# Status nibble stored per message, and back
+STATUS_BY_TYPE = {'note_off': 0x80, 'note_on': 0x90, 'control_change': 0xB0}
+TYPE_BY_STATUS = {v: k for k, v in STATUS_BY_TYPE.items()}
+
+NO_PULSE = -1  # Sentinel in the pulse column for unstamped messages
+
+
 class RollingMidiBuffer:
     """
-    Thread-safe rolling buffer maintaining MIDI messages from the last N seconds.
+    Rolling buffer maintaining MIDI messages from the last N seconds.
     Automatically discards old messages.
+
+    Messages are stored as a struct-of-arrays in preallocated circular NumPy
+    columns (ts_ns, status, data1, data2, pulse) rather than one Python object
+    per message, so the input path allocates nothing and expiry is a binary
+    search over the timestamp column. When more than `capacity` messages fall
+    inside the window, the oldest are overwritten.
+
+    No lock: one thread adds messages and owns `_tail`/`_head`; readers only
+    take snapshots, and clear() moves a separate reader-owned `_floor`. A
+    message is written before `_tail` advances, and a snapshot drops any
+    slots the writer may have overwritten while it was being copied, so a
+    full buffer reads back its newest `capacity - 1` messages.
     """
 
-    def __init__(self, window_seconds: float = 4.0):
+    def __init__(self, window_seconds: float = 4.0, capacity: int = 4096):
         """
         Args:
             window_seconds: Keep messages from the last N seconds.
+            capacity: Maximum messages held (rounded up to 2**k).
         """
         self.window_seconds = window_seconds
-        self.buffer = deque()  # List of TimestampedMidiMsg
-        self.lock = threading.RLock()
+        self.window_ns = int(window_seconds * 1e9)
+        size = 1 << max(1, (capacity - 1).bit_length())
+        self._size = size
+        self._mask = size - 1
+        self._ts = np.zeros(size, dtype=np.int64)  # time.monotonic_ns()
+        self._status = np.zeros(size, dtype=np.uint8)
+        self._data1 = np.zeros(size, dtype=np.uint8)
+        self._data2 = np.zeros(size, dtype=np.uint8)
+        self._pulse = np.full(size, NO_PULSE, dtype=np.int64)
+        self._head = 0  # Logical index of oldest message (writer-owned)
+        self._tail = 0  # Logical index of next write (writer-owned)
+        self._floor = 0  # Messages below this index were cleared (reader-owned)
         self.start_time = time.monotonic()  # Reference for relative timestamps
 
+    def __len__(self) -> int:
+        return self._tail - max(self._head, self._floor)
+
     def add_message(self, msg_type: str, **kwargs) -> None:
         """
         Add a MIDI message to the buffer.
 
         Args:
             msg_type: 'note_on', 'note_off', or 'control_change'
-            **kwargs: Other attributes (note, velocity, control, value, etc.)
+            **kwargs: Other attributes (note, velocity, control, value, pulse)
         """
-        timestamp = time.monotonic()
-        msg = TimestampedMidiMsg(msg_type=msg_type, timestamp=timestamp, **kwargs)
+        status = STATUS_BY_TYPE[msg_type]
+        if status == 0xB0:
+            data1 = kwargs.get('control') or 0
+            data2 = kwargs.get('value') or 0
+        else:
+            data1 = kwargs.get('note') or 0
+            data2 = kwargs.get('velocity') or 0
+        self.add_raw(status, data1, data2, kwargs.get('pulse'))
 
-        with self.lock:
-            self.buffer.append(msg)
-            self._trim_old_messages()
+    def add_raw(self, status: int, data1: int, data2: int, pulse: Optional[int] = None) -> None:
+        """
+        Add a message given its status nibble (0x80/0x90/0xB0) and data bytes.
+
+        Same as add_message() without the type-name lookup and kwargs
+        unpacking; this is what the bridge's input thread calls. Writer
+        side: only one thread may add messages.
+        """
+        ts_ns = time.monotonic_ns()
+        tail = self._tail
+        i = tail & self._mask
+        self._ts[i] = ts_ns
+        self._status[i] = status
+        self._data1[i] = data1
+        self._data2[i] = data2
+        self._pulse[i] = NO_PULSE if pulse is None else pulse
+        tail += 1
+        self._tail = tail  # Publish
+        if tail - self._head > self._size:
+            self._head = tail - self._size
+        self._trim_old_messages(ts_ns)
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Return a snapshot of the buffer as columns, oldest first.
+
+        Keys: 'ts_ns', 'status', 'data1', 'data2', 'pulse' (NO_PULSE when the
+        message had no clock stamp). Arrays are copies.
+        """
+        tail = self._tail
+        head = max(self._head, self._floor)
+        idx = np.arange(head, tail) & self._mask
+        ts = self._ts[idx]
+        status = self._status[idx]
+        data1 = self._data1[idx]
+        data2 = self._data2[idx]
+        pulse = self._pulse[idx]
+        # Skip slots the writer may have reused during the copy (its next
+        # write lands on index _tail - size), then anything past the window
+        start = max(0, self._tail + 1 - self._size - head)
+        cutoff = time.monotonic_ns() - self.window_ns
+        start += int(np.searchsorted(ts[start:], cutoff, side='left'))
+        return {
+            'ts_ns': ts[start:],
+            'status': status[start:],
+            'data1': data1[start:],
+            'data2': data2[start:],
+            'pulse': pulse[start:],
+        }
 
     def get_messages(self) -> List[TimestampedMidiMsg]:
         """
         Return a copy of all messages currently in the buffer.
         """
-        with self.lock:
-            self._trim_old_messages()
-            return list(self.buffer)
+        cols = self.get_arrays()
+        messages = []
+        for ts_ns, status, data1, data2, pulse in zip(
+            cols['ts_ns'].tolist(),
+            cols['status'].tolist(),
+            cols['data1'].tolist(),
+            cols['data2'].tolist(),
+            cols['pulse'].tolist(),
+        ):
+            msg_type = TYPE_BY_STATUS[status]
+            msg = TimestampedMidiMsg(
+                msg_type=msg_type,
+                timestamp=ts_ns / 1e9,
+                pulse=None if pulse == NO_PULSE else pulse,
+            )
+            if status == 0xB0:
+                msg.control, msg.value = data1, data2
+            else:
+                msg.note, msg.velocity = data1, data2
+            messages.append(msg)
+        return messages
 
     def clear(self) -> None:
         """Clear the buffer."""
-        with self.lock:
-            self.buffer.clear()
+        self._floor = self._tail
 
     def get_duration_seconds(self) -> float:
         """Get the time span of messages currently in buffer."""
-        with self.lock:
-            if not self.buffer:
-                return 0.0
-            span = self.buffer[-1].timestamp - self.buffer[0].timestamp
-            return span
-
-    def _trim_old_messages(self) -> None:
-        """Remove messages older than window_seconds. Called with lock held."""
-        now = time.monotonic()
-        cutoff = now - self.window_seconds
-
-        while self.buffer and self.buffer[0].timestamp < cutoff:
-            self.buffer.popleft()
+        ts = self.get_arrays()['ts_ns']
+        if len(ts) == 0:
+            return 0.0
+        return (int(ts[-1]) - int(ts[0])) / 1e9
+
+    def _trim_old_messages(self, now_ns: int) -> None:
+        """Drop messages older than window_seconds. Writer side only."""
+        n = self._tail - self._head
+        if n == 0:
+            return
+        cutoff = now_ns - self.window_ns
+        start = self._head & self._mask
+        end = start + n
+        # Live region is at most two contiguous runs, each sorted by time
+        first = self._ts[start:min(end, self._size)]
+        expired = int(np.searchsorted(first, cutoff, side='left'))
+        if expired == len(first) and end > self._size:
+            second = self._ts[:end - self._size]
+            expired += int(np.searchsorted(second, cutoff, side='left'))
+        self._head += expired
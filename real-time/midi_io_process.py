@@ -0,0 +1,98 @@
+"""Dedicated MIDI input process feeding a shared-memory ring.
+
+Started by ableton_bridge.main() with --io_process, before torch is imported,
+so the rtmidi callback never competes with the inference process for the
+GIL. The process opens the input port, pushes every 3-byte message into the
+ring, and exits when the stop event is set. Messages are stamped with the
+clock pulse the bridge's ClockGrid publishes into a shared value; until the
+grid exists they go unstamped and the bridge stamps them when it drains.
+"""
+
+import logging
+import multiprocessing
+
+try:
+    from .ableton_bridge_engine import _match_port
+    from .ring import NO_STAMP, pack_midi
+    from .rt_priority import promote_current_thread
+    from .shm_ring import ShmSpscRing
+except ImportError:
+    from ableton_bridge_engine import _match_port
+    from ring import NO_STAMP, pack_midi
+    from rt_priority import promote_current_thread
+    from shm_ring import ShmSpscRing
+
+logger = logging.getLogger(__name__)
+
+
+def _open_input(port_name: str):
+    import rtmidi
+
+    midi_in = rtmidi.MidiIn()
+    available = midi_in.get_ports()
+    port_index = _match_port(available, port_name)
+    midi_in.open_port(port_index)
+    return midi_in, available[port_index]
+
+
+def run_midi_input(port_name: str, ring_args, stop_event, shared_pulse, rt_prio=None, rt_core=None) -> None:
+    """Process entry point: forward port_name's input into the ring."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(levelname)s %(asctime)s] %(name)s: %(message)s',
+        datefmt='%H:%M:%S',
+    )
+    ring = ShmSpscRing(*ring_args)
+    midi_in = None
+    try:
+        midi_in, opened = _open_input(port_name)
+        promote_pending = [rt_prio is not None or rt_core is not None]
+
+        def on_midi_in(event, data=None):
+            if promote_pending[0]:
+                promote_pending[0] = False
+                promote_current_thread(rt_prio, rt_core)
+            message = event[0]
+            if len(message) == 3:
+                pulse = shared_pulse.value
+                stamp = pulse if pulse >= 0 else NO_STAMP
+                ring.push(pack_midi(stamp, message[0], message[1], message[2]))
+
+        midi_in.set_callback(on_midi_in)
+        logger.info(f"MIDI I/O process reading '{opened}'")
+        stop_event.wait()
+    except Exception as e:
+        logger.exception(f"MIDI I/O process error: {e}")
+    finally:
+        if midi_in is not None:
+            midi_in.cancel_callback()
+            midi_in.close_port()
+        if ring.dropped:
+            logger.warning(f"MIDI I/O process dropped {ring.dropped} messages (ring full)")
+        ring.wake()
+        ring.close()
+
+
+def start_midi_input_process(port_name: str, capacity: int = 4096, rt_prio=None, rt_core=None):
+    """
+    Create the shared ring and spawn the input process.
+
+    Returns:
+        (ring, process, stop_event, shared_pulse). Hand shared_pulse to the
+        bridge's ClockGrid so input is stamped at arrival. Set stop_event and
+        join the process, then close the ring, to shut down.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    ring = ShmSpscRing(capacity=capacity, ready=ctx.Event())
+    stop_event = ctx.Event()
+    # Current clock pulse, -1 while there is no clock; aligned 8-byte loads
+    # and stores, so no lock
+    shared_pulse = ctx.Value('q', -1, lock=False)
+    process = ctx.Process(
+        target=run_midi_input,
+        args=(port_name, ring.attach_args(), stop_event, shared_pulse, rt_prio, rt_core),
+        name="midi-io",
+        daemon=True,
+    )
+    process.start()
+    return ring, process, stop_event, shared_pulse
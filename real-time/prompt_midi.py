@@ -1,10 +1,12 @@
 """Convert rolling MIDI buffer to prompt format for Aria model."""
 
 import io
-import tempfile
 import time
+from operator import attrgetter
 from typing import List, Tuple
 
+import numpy as np
+
 try:
     from .midi_buffer import TimestampedMidiMsg
 except ImportError:
@@ -42,67 +44,37 @@ def buffer_to_midi_dict(messages: List[TimestampedMidiMsg]) -> dict:
     MS_PER_QUARTER = 500  # at 120 BPM
     ticks_per_ms = RESOLUTION / MS_PER_QUARTER
 
-    # Get time reference
-    if not messages:
-        return {'note_msgs': [], 'pedal_msgs': [], 'resolution': RESOLUTION}
-
+    # All ticks in one vectorized pass (same float ops as per message)
     first_timestamp = messages[0].timestamp
+    timestamps = np.fromiter((m.timestamp for m in messages), dtype=np.float64, count=len(messages))
+    ticks = ((timestamps - first_timestamp) * 1000 * ticks_per_ms).astype(np.int64).tolist()
     note_msgs = []
     pedal_msgs = []
-    active_notes = {}  # {(note_pitch, velocity): (msg_index, start_tick)}
-
-    for msg in messages:
-        relative_ms = (msg.timestamp - first_timestamp) * 1000  # Convert to ms
-        tick = int(relative_ms * ticks_per_ms)
+    # {pitch: {velocity: start_tick}}; each inner dict keeps note_on order,
+    # so a note_off closes the oldest open note of its pitch without a scan
+    active_by_pitch = {}
 
+    for msg, tick in zip(messages, ticks):
         if msg.msg_type == 'note_on' and msg.velocity and msg.velocity > 0:
             # Record start of note
-            key = (msg.note, msg.velocity)
-            active_notes[key] = tick
+            active_by_pitch.setdefault(msg.note, {})[msg.velocity] = tick
 
         elif msg.msg_type == 'note_off' or (msg.msg_type == 'note_on' and msg.velocity == 0):
-            # Find and finalize note
+            # Finalize the oldest open note with this pitch
             pitch = msg.note
-            # Try to find a matching note_on (prefer match by pitch)
-            end_tick = int(relative_ms * ticks_per_ms)
-            found = False
-
-            # Find first matching note with this pitch
-            matching_key = None
-            for (note_pitch, velocity), start_tick in list(active_notes.items()):
-                if note_pitch == pitch:
-                    matching_key = (note_pitch, velocity)
-                    duration_ticks = max(1, end_tick - start_tick)
-                    note_msgs.append({
-                        'data': {
-                            'start': start_tick,
-                            'duration': duration_ticks,
-                            'pitch': pitch,
-                            'velocity': velocity,
-                        },
-                        'tick': start_tick,
-                    })
-                    del active_notes[matching_key]
-                    found = True
-                    break
-
-            if not found and pitch in [n[0] for n in active_notes.keys()]:
-                # Fallback: just use first note with this pitch
-                for (note_pitch, vel) in list(active_notes.keys()):
-                    if note_pitch == pitch:
-                        start_tick = active_notes[(note_pitch, vel)]
-                        duration_ticks = max(1, end_tick - start_tick)
-                        note_msgs.append({
-                            'data': {
-                                'start': start_tick,
-                                'duration': duration_ticks,
-                                'pitch': pitch,
-                                'velocity': vel,
-                            },
-                            'tick': start_tick,
-                        })
-                        del active_notes[(note_pitch, vel)]
-                        break
+            open_notes = active_by_pitch.get(pitch)
+            if open_notes:
+                velocity = next(iter(open_notes))
+                start_tick = open_notes.pop(velocity)
+                note_msgs.append({
+                    'data': {
+                        'start': start_tick,
+                        'duration': max(1, tick - start_tick),
+                        'pitch': pitch,
+                        'velocity': velocity,
+                    },
+                    'tick': start_tick,
+                })
 
         elif msg.msg_type == 'control_change' and msg.control == 64:
             # Sustain pedal
@@ -112,7 +84,13 @@ def buffer_to_midi_dict(messages: List[TimestampedMidiMsg]) -> dict:
             })
 
     # Convert remaining active notes to closed notes with zero duration
-    for (note_pitch, velocity), start_tick in active_notes.items():
+    leftovers = [
+        (start_tick, note_pitch, velocity)
+        for note_pitch, open_notes in active_by_pitch.items()
+        for velocity, start_tick in open_notes.items()
+    ]
+    leftovers.sort()
+    for start_tick, note_pitch, velocity in leftovers:
         note_msgs.append({
             'data': {
                 'start': start_tick,
@@ -130,17 +108,36 @@ def buffer_to_midi_dict(messages: List[TimestampedMidiMsg]) -> dict:
     }
 
 
-def buffer_to_tempfile_midi(
+def _append_prompt_messages(track: MidiTrack, sorted_msgs: List[TimestampedMidiMsg], ticks: List[int]) -> None:
+    """Append note/sustain messages at their absolute ticks as delta-timed track events."""
+    last_tick = 0
+    for msg, tick in zip(sorted_msgs, ticks):
+        delta = max(0, tick - last_tick)
+
+        if msg.msg_type == 'note_on' and msg.velocity and msg.velocity > 0:
+            track.append(Message('note_on', note=msg.note, velocity=msg.velocity, time=delta))
+            last_tick = tick
+        elif msg.msg_type == 'note_off' or (msg.msg_type == 'note_on' and msg.velocity == 0):
+            vel = msg.velocity if msg.velocity else 0
+            track.append(Message('note_off', note=msg.note, velocity=vel, time=delta))
+            last_tick = tick
+        elif msg.msg_type == 'control_change' and msg.control == 64:
+            value = 127 if (msg.value and msg.value > 64) else 0
+            track.append(Message('control_change', control=64, value=value, time=delta))
+            last_tick = tick
+
+
+def buffer_to_midi_file(
     messages: List[TimestampedMidiMsg],
     window_seconds: float = 4.0,
     current_bpm: float = None,
     ticks_per_beat: int = 480,
-) -> str:
+) -> MidiFile:
     """
-    Convert buffer to a temporary MIDI file and return path.
+    Convert buffer to an in-memory mido.MidiFile.
     
-    Extracts only messages from the last window_seconds of the buffer.
-    Uses NamedTemporaryFile suffix='.mid', delete=False to keep it around.
+    Extracts only messages from the last window_seconds of the buffer
+    (pulse-stamped messages are all kept).
     
     Args:
         messages: List of timestamped MIDI messages
@@ -149,98 +146,39 @@ def buffer_to_tempfile_midi(
         ticks_per_beat: MIDI resolution (default: 480)
     
     Returns:
-        Path to the temporary .mid file.
+        The prompt as a MidiFile; nothing is written to disk.
     """
-    # Handle empty input
-    if not messages:
-        mid = MidiFile()
-        track = MidiTrack()
-        mid.tracks.append(track)
-        if current_bpm:
-            microseconds_per_beat = int(60_000_000 / current_bpm)
-            track.append(MetaMessage('set_tempo', tempo=microseconds_per_beat, time=0))
+    mid = MidiFile()
+    track = MidiTrack()
+    mid.tracks.append(track)
+    mid.ticks_per_beat = ticks_per_beat
+
+    if current_bpm:
+        microseconds_per_beat = int(60_000_000 / current_bpm)
+        track.append(MetaMessage('set_tempo', tempo=microseconds_per_beat, time=0))
+
+    # If messages include pulse information, prefer pulse-based conversion
+    # (unstamped messages are then dropped)
+    pulsed_msgs = [m for m in messages if m.pulse is not None]
+    if pulsed_msgs:
+        PPQN = 24
+        sorted_msgs = sorted(pulsed_msgs, key=attrgetter('pulse'))
+        first_pulse = sorted_msgs[0].pulse
+        # Exact integer pulse -> tick (no per-message float divide)
+        ticks = [(m.pulse - first_pulse) * ticks_per_beat // PPQN for m in sorted_msgs]
+    else:
+        cutoff_time = time.monotonic() - window_seconds
+        windowed_msgs = [msg for msg in messages if msg.timestamp >= cutoff_time]
+        sorted_msgs = sorted(windowed_msgs, key=attrgetter('timestamp'))
+        if windowed_msgs:
+            first_timestamp = windowed_msgs[0].timestamp
+            ticks_per_ms = ticks_per_beat / 500.0  # Normalize to ticks_per_beat
+            ticks = [int((m.timestamp - first_timestamp) * 1000 * ticks_per_ms) for m in sorted_msgs]
+
+    if not sorted_msgs:
+        # Nothing in the window: an empty prompt
         track.append(Message('program_change', program=0, time=0))
-        mid.ticks_per_beat = ticks_per_beat
     else:
-        # If messages include pulse information, prefer pulse-based conversion
-        has_pulse = any(getattr(m, 'pulse', None) is not None for m in messages)
-        if has_pulse:
-            windowed_msgs = list(messages)
-        else:
-            now = time.monotonic()
-            cutoff_time = now - window_seconds
-            windowed_msgs = [msg for msg in messages if msg.timestamp >= cutoff_time]
-
-        if not windowed_msgs:
-            mid = MidiFile()
-            track = MidiTrack()
-            mid.tracks.append(track)
-            if current_bpm:
-                microseconds_per_beat = int(60_000_000 / current_bpm)
-                track.append(MetaMessage('set_tempo', tempo=microseconds_per_beat, time=0))
-            track.append(Message('program_change', program=0, time=0))
-            mid.ticks_per_beat = ticks_per_beat
-        else:
-            # Reconstruct MIDI from windowed messages
-            mid = MidiFile()
-            track = MidiTrack()
-            mid.tracks.append(track)
-            mid.ticks_per_beat = ticks_per_beat
-
-            if current_bpm:
-                microseconds_per_beat = int(60_000_000 / current_bpm)
-                track.append(MetaMessage('set_tempo', tempo=microseconds_per_beat, time=0))
-
-            uses_pulse = any(getattr(m, 'pulse', None) is not None for m in windowed_msgs)
-
-            if uses_pulse:
-                PPQN = 24.0
-                first_pulse = min(m.pulse for m in windowed_msgs if getattr(m, 'pulse', None) is not None)
-                last_tick = 0
-                sorted_msgs = sorted(windowed_msgs, key=lambda m: (m.pulse if getattr(m, 'pulse', None) is not None else 0))
-
-                for msg in sorted_msgs:
-                    if getattr(msg, 'pulse', None) is None:
-                        continue
-                    tick = int(((msg.pulse - first_pulse) / PPQN) * ticks_per_beat)
-                    delta = max(0, tick - last_tick)
-
-                    if msg.msg_type == 'note_on' and msg.velocity and msg.velocity > 0:
-                        track.append(Message('note_on', note=msg.note, velocity=msg.velocity, time=delta))
-                        last_tick = tick
-                    elif msg.msg_type == 'note_off' or (msg.msg_type == 'note_on' and msg.velocity == 0):
-                        vel = msg.velocity if msg.velocity else 0
-                        track.append(Message('note_off', note=msg.note, velocity=vel, time=delta))
-                        last_tick = tick
-                    elif msg.msg_type == 'control_change' and msg.control == 64:
-                        value = 127 if (msg.value and msg.value > 64) else 0
-                        track.append(Message('control_change', control=64, value=value, time=delta))
-                        last_tick = tick
-
-            else:
-                first_timestamp = windowed_msgs[0].timestamp
-                last_tick = 0
-                sorted_msgs = sorted(windowed_msgs, key=lambda m: m.timestamp)
-
-                for msg in sorted_msgs:
-                    relative_ms = (msg.timestamp - first_timestamp) * 1000
-                    tick = int(relative_ms * (ticks_per_beat / 500.0))  # Normalize to ticks_per_beat
-                    delta = max(0, tick - last_tick)
-
-                    if msg.msg_type == 'note_on' and msg.velocity and msg.velocity > 0:
-                        track.append(Message('note_on', note=msg.note, velocity=msg.velocity, time=delta))
-                        last_tick = tick
-                    elif msg.msg_type == 'note_off' or (msg.msg_type == 'note_on' and msg.velocity == 0):
-                        vel = msg.velocity if msg.velocity else 0
-                        track.append(Message('note_off', note=msg.note, velocity=vel, time=delta))
-                        last_tick = tick
-                    elif msg.msg_type == 'control_change' and msg.control == 64:
-                        value = 127 if (msg.value and msg.value > 64) else 0
-                        track.append(Message('control_change', control=64, value=value, time=delta))
-                        last_tick = tick
-
-    # Write to temp file
-    tmp = tempfile.NamedTemporaryFile(suffix='.mid', delete=False)
-    tmp.close()
-    mid.save(tmp.name)
-    return tmp.name
+        _append_prompt_messages(track, sorted_msgs, ticks)
+
+    return mid
@@ -0,0 +1,175 @@
+"""Lock-free single-producer/single-consumer ring buffers.
+
+The rtmidi callback thread is the only producer and the bridge's input thread
+is the only consumer. Each side owns one index (tail/head), so no lock is
+needed: under the GIL a plain int store is atomic, and the producer publishes
+a slot by writing it before advancing the tail.
+
+SpscRing carries MIDI ingress records packed into a single uint64:
+    bits 63..32  stamp (MIDI clock pulse, or NO_STAMP)
+    bits 23..16  status byte
+    bits 15..8   data1
+    bits  7..0   data2
+
+ObjectRing is the same structure over preallocated Python object slots, for
+handing arbitrary items (e.g. events for the output thread) between threads.
+"""
+
+import threading
+
+import numpy as np
+
+NO_STAMP = 0xFFFFFFFF  # Record carries no clock pulse
+
+
+def pack_midi(stamp: int, status: int, data1: int = 0, data2: int = 0) -> int:
+    """Pack a stamped 3-byte MIDI message into a uint64 record."""
+    return ((stamp & 0xFFFFFFFF) << 32) | (status << 16) | (data1 << 8) | data2
+
+
+def unpack_midi(word: int):
+    """Inverse of pack_midi: returns (stamp, status, data1, data2)."""
+    return word >> 32, (word >> 16) & 0xFF, (word >> 8) & 0xFF, word & 0xFF
+
+
+class SpscRing:
+    """
+    Fixed-capacity SPSC ring of packed uint64 records.
+
+    Capacity is rounded up to a power of two so slots are addressed with
+    `index & mask`. When the ring is full, push() drops the record and counts
+    it in `dropped` rather than blocking the producer.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Minimum number of records held (rounded up to 2**k).
+        """
+        size = 1 << max(1, (capacity - 1).bit_length())
+        self._buf = np.zeros(size, dtype=np.uint64)
+        self._size = size
+        self._mask = size - 1
+        self._head = 0  # Next slot to read (consumer-owned)
+        self._tail = 0  # Next slot to write (producer-owned)
+        self._ready = threading.Event()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def push(self, word: int) -> bool:
+        """Producer side. Returns False if the ring was full."""
+        tail = self._tail
+        head = self._head
+        if tail - head > self._mask:
+            self.dropped += 1
+            return False
+        self._buf[tail & self._mask] = word
+        self._tail = tail + 1
+        # Only wake the consumer on the empty -> non-empty transition. Re-read
+        # the head after publishing: the consumer may have drained and parked
+        # in wait() since the read above, and that stale head would skip the
+        # wakeup
+        if self._head == tail:
+            self._ready.set()
+        return True
+
+    def drain(self) -> np.ndarray:
+        """Consumer side. Pop every published record as one batch."""
+        head = self._head
+        tail = self._tail
+        n = tail - head
+        if n <= 0:
+            return self._buf[:0]
+        start = head & self._mask
+        end = start + n
+        if end <= self._size:
+            batch = self._buf[start:end].copy()
+        else:
+            batch = np.concatenate(
+                (self._buf[start:], self._buf[: end - self._size])
+            )
+        self._head = tail
+        return batch
+
+    def wait(self, timeout: float = None) -> bool:
+        """Consumer side. Block until at least one record is available."""
+        if self._tail != self._head:
+            return True
+        self._ready.clear()
+        # Re-check after clearing so a push racing with clear() isn't lost
+        if self._tail != self._head:
+            return True
+        return self._ready.wait(timeout)
+
+    def wake(self) -> None:
+        """Wake a blocked consumer (e.g. on shutdown)."""
+        self._ready.set()
+
+
+class ObjectRing:
+    """
+    Fixed-capacity SPSC ring of Python objects.
+
+    Same index discipline as SpscRing: the producer owns the tail, the
+    consumer owns the head, and a slot is written before the tail advances.
+    Non-blocking on both sides; push() returns False when full. A consumer
+    that wants to sleep uses wait(), which is only signalled on the
+    empty -> non-empty transition.
+    """
+
+    def __init__(self, capacity: int = 256):
+        """
+        Args:
+            capacity: Minimum number of items held (rounded up to 2**k).
+        """
+        size = 1 << max(1, (capacity - 1).bit_length())
+        self._slots = [None] * size
+        self._mask = size - 1
+        self._head = 0
+        self._tail = 0
+        self._ready = threading.Event()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def push(self, item) -> bool:
+        """Producer side. Returns False if the ring was full."""
+        tail = self._tail
+        head = self._head
+        if tail - head > self._mask:
+            self.dropped += 1
+            return False
+        self._slots[tail & self._mask] = item
+        self._tail = tail + 1
+        # Fresh head read, as in SpscRing.push
+        if self._head == tail:
+            self._ready.set()
+        return True
+
+    def pop(self):
+        """Consumer side. Next item, or None if the ring is empty."""
+        head = self._head
+        if head == self._tail:
+            return None
+        i = head & self._mask
+        item = self._slots[i]
+        self._slots[i] = None  # Don't keep the item alive
+        self._head = head + 1
+        return item
+
+    def wait(self, timeout: float = None) -> bool:
+        """Consumer side. Block until at least one item is available."""
+        if self._tail != self._head:
+            return True
+        self._ready.clear()
+        # Re-check after clearing so a push racing with clear() isn't lost
+        if self._tail != self._head:
+            return True
+        return self._ready.wait(timeout)
+
+    def wake(self) -> None:
+        """Wake a blocked consumer (e.g. on shutdown)."""
+        self._ready.set()
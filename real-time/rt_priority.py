@@ -0,0 +1,52 @@
+"""Best-effort real-time scheduling for the calling thread.
+
+On Linux, sched_setscheduler/sched_setaffinity with pid 0 act on the calling
+thread only, so these helpers are meant to be called from the thread being
+promoted (e.g. once from inside the rtmidi callback). SCHED_FIFO needs root
+or CAP_SYS_NICE / an rtprio rlimit; failures are logged, never raised, so the
+bridge keeps running with normal scheduling.
+"""
+
+import logging
+import os
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def set_realtime_priority(priority: int) -> bool:
+    """Give the calling thread real-time priority. Returns True on success."""
+    try:
+        if sys.platform.startswith("linux"):
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            return True
+        if sys.platform == "win32":
+            import ctypes
+
+            THREAD_PRIORITY_TIME_CRITICAL = 15
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetCurrentThread()
+            return bool(kernel32.SetThreadPriority(handle, THREAD_PRIORITY_TIME_CRITICAL))
+        logger.warning(f"Real-time priority not supported on {sys.platform}")
+    except (OSError, AttributeError) as e:
+        logger.warning(f"Could not set real-time priority {priority}: {e}")
+    return False
+
+
+def pin_to_core(core: int) -> bool:
+    """Pin the calling thread to one CPU core (Linux only)."""
+    try:
+        os.sched_setaffinity(0, {core})
+        return True
+    except (OSError, AttributeError) as e:
+        logger.warning(f"Could not pin thread to core {core}: {e}")
+    return False
+
+
+def promote_current_thread(priority=None, core=None) -> None:
+    """Apply whichever of priority/core is set to the calling thread."""
+    if priority is not None and set_realtime_priority(priority):
+        logger.info(f"Thread {threading.get_native_id()} running at real-time priority {priority}")
+    if core is not None and pin_to_core(core):
+        logger.info(f"Thread {threading.get_native_id()} pinned to core {core}")
@@ -0,0 +1,143 @@
+"""Deferred logging for the real-time threads.
+
+Formatting a stdlib log record (asctime, %-formatting, handler locks) costs
+tens of microseconds on the calling thread. Hot paths instead push a fixed
+binary record (timestamp, message code, up to four integer args) into a
+preallocated ring, and a daemon thread formats the records into the stdlib
+logger every flush interval, with their original timestamps.
+
+Usage:
+    NOTE_ON = rtlog.define(logger, logging.INFO, "note pitch=%d vel=%d")
+    ...
+    rtlog.push(NOTE_ON, pitch, vel)
+
+Args must be ints; pass -1 for "none". Messages below their logger's
+effective level are dropped in push(), so debug-level records cost only a
+level check in production. Producers may run on any thread: a
+slot is claimed from an atomic counter and published by writing its sequence
+number last, so the flusher never reads a half-written record. If producers
+lap the flusher, the overwritten records are counted and reported.
+"""
+
+import itertools
+import logging
+import threading
+import time
+
+import numpy as np
+
+N_ARGS = 4
+
+_messages = []  # code -> (logger, level, fmt, n_args)
+
+
+def define(logger: logging.Logger, level: int, fmt: str) -> int:
+    """Register a message format and return its code. Call at import time."""
+    n_args = fmt.count('%') - 2 * fmt.count('%%')
+    assert n_args <= N_ARGS, f"at most {N_ARGS} args: {fmt!r}"
+    _messages.append((logger, level, fmt, n_args))
+    return len(_messages) - 1
+
+
+class RtLog:
+    """Multi-producer ring of binary log records with a flusher thread."""
+
+    def __init__(self, capacity: int = 8192, flush_interval: float = 0.2):
+        """
+        Args:
+            capacity: Records held between flushes (rounded up to 2**k).
+            flush_interval: Seconds between flushes.
+        """
+        size = 1 << max(1, (capacity - 1).bit_length())
+        self._mask = size - 1
+        self._seq = np.full(size, -1, dtype=np.int64)  # Publishes the slot
+        self._ts = np.zeros(size, dtype=np.int64)  # time.monotonic_ns()
+        self._code = np.zeros(size, dtype=np.uint16)
+        self._args = np.zeros((size, N_ARGS), dtype=np.int64)
+        self._counter = itertools.count()  # next() is atomic under the GIL
+        self._read = 0
+        self.dropped = 0
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def push(self, code: int, a: int = 0, b: int = 0, c: int = 0, d: int = 0) -> None:
+        """Record a message. Safe from any thread; never formats or blocks."""
+        # Drop messages whose level is filtered out before touching the ring
+        # (isEnabledFor is a cached dict lookup)
+        logger, level = _messages[code][:2]
+        if not logger.isEnabledFor(level):
+            return
+        n = next(self._counter)
+        i = n & self._mask
+        self._ts[i] = time.monotonic_ns()
+        self._code[i] = code
+        row = self._args[i]
+        row[0] = a
+        row[1] = b
+        row[2] = c
+        row[3] = d
+        self._seq[i] = n
+
+    def flush(self) -> int:
+        """Format every published record into its logger. Returns the count."""
+        now_ns = time.monotonic_ns()
+        now_wall = time.time()
+        count = 0
+        while True:
+            r = self._read
+            i = r & self._mask
+            seq = int(self._seq[i])
+            if seq < r:
+                break  # Not yet published
+            if seq > r:
+                # Producers lapped us; skip to the oldest record still held
+                oldest = max(seq - self._mask, r + 1)
+                self.dropped += oldest - r
+                self._read = oldest
+                continue
+            logger, level, fmt, n_args = _messages[int(self._code[i])]
+            if logger.isEnabledFor(level):
+                args = tuple(self._args[i].tolist()[:n_args])
+                record = logger.makeRecord(logger.name, level, __file__, 0, fmt, args, None)
+                created = now_wall - (now_ns - int(self._ts[i])) / 1e9
+                record.created = created
+                record.msecs = (created - int(created)) * 1000
+                logger.handle(record)
+            self._read = r + 1
+            count += 1
+        return count
+
+    def start(self) -> None:
+        """Start the flusher thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name="rtlog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher thread and flush what is left."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.flush()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if self.dropped:
+                    logging.getLogger(__name__).warning(f"rtlog dropped {self.dropped} records")
+                    self.dropped = 0
+            except Exception:
+                logging.getLogger(__name__).exception("rtlog flush failed")
+
+
+# Process-wide instance used by the bridge threads
+_log = RtLog()
+push = _log.push
+flush = _log.flush
+start = _log.start
+stop = _log.stop
@@ -0,0 +1,131 @@
+"""Shared-memory SPSC ring for MIDI ingress across processes.
+
+Same record format and interface as ring.SpscRing, but the slots and the
+head/tail indices live in a multiprocessing.shared_memory block so the MIDI
+I/O process can produce while the inference process consumes, each with its
+own GIL.
+
+Block layout (uint64 words):
+    word 0       head (consumer-owned)
+    word 8       tail (producer-owned), on its own cache line
+    word 16...   record slots
+
+Each side only ever writes its own index, and the producer writes a slot
+before publishing it by advancing the tail. Aligned 8-byte stores are atomic
+and stay ordered on x86-64 (TSO), the bridge's target platform.
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+HEADER_WORDS = 16
+_HEAD = 0
+_TAIL = 8
+
+
+class ShmSpscRing:
+    """
+    Fixed-capacity SPSC ring of packed uint64 records in shared memory.
+
+    The creating process owns the block and unlinks it in close(). The other
+    process attaches with the same name, capacity and ready event.
+    """
+
+    def __init__(self, capacity: int = 4096, name: str = None, ready=None):
+        """
+        Args:
+            capacity: Minimum number of records held (rounded up to 2**k).
+            name: Existing block to attach to; None creates a new one.
+            ready: multiprocessing.Event shared with the peer (created if None).
+        """
+        size = 1 << max(1, (capacity - 1).bit_length())
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=(HEADER_WORDS + size) * 8
+            )
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._words = np.ndarray(
+            (HEADER_WORDS + size,), dtype=np.uint64, buffer=self.shm.buf
+        )
+        if self._owner:
+            self._words[:] = 0
+        self._buf = self._words[HEADER_WORDS:]
+        self._size = size
+        self._mask = size - 1
+        self.capacity = capacity
+        self.ready = ready if ready is not None else multiprocessing.Event()
+        self.dropped = 0  # Counted on the producer side only
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def attach_args(self):
+        """Arguments for ShmSpscRing(...) in the peer process."""
+        return self.capacity, self.shm.name, self.ready
+
+    def __len__(self) -> int:
+        return int(self._words[_TAIL]) - int(self._words[_HEAD])
+
+    def push(self, word: int) -> bool:
+        """Producer side. Returns False if the ring was full."""
+        tail = int(self._words[_TAIL])
+        head = int(self._words[_HEAD])
+        if tail - head > self._mask:
+            self.dropped += 1
+            return False
+        self._buf[tail & self._mask] = word
+        self._words[_TAIL] = tail + 1
+        # Always signal. Re-reading the head here (as SpscRing does) isn't
+        # enough across processes: x86 may still order this load before the
+        # tail store above, so a consumer parking in wait() could be missed.
+        # set() takes a lock, which publishes the tail first, and wait()
+        # re-checks the ring after clear(). ~1 us per message, paid in the
+        # I/O process.
+        self.ready.set()
+        return True
+
+    def drain(self) -> np.ndarray:
+        """Consumer side. Pop every published record as one batch."""
+        head = int(self._words[_HEAD])
+        tail = int(self._words[_TAIL])
+        n = tail - head
+        if n <= 0:
+            return self._buf[:0].copy()
+        start = head & self._mask
+        end = start + n
+        if end <= self._size:
+            batch = self._buf[start:end].copy()
+        else:
+            batch = np.concatenate(
+                (self._buf[start:], self._buf[: end - self._size])
+            )
+        self._words[_HEAD] = tail
+        return batch
+
+    def wait(self, timeout: float = None) -> bool:
+        """Consumer side. Block until at least one record is available."""
+        if len(self):
+            return True
+        self.ready.clear()
+        # Re-check after clearing so a push racing with clear() isn't lost
+        if len(self):
+            return True
+        return self.ready.wait(timeout)
+
+    def wake(self) -> None:
+        """Wake a blocked consumer (e.g. on shutdown)."""
+        self.ready.set()
+
+    def close(self) -> None:
+        """Release the mapping; the owner also unlinks the block."""
+        # numpy views must be dropped before the buffer can be released
+        self._buf = None
+        self._words = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
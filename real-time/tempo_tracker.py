@@ -16,6 +16,9 @@ class TempoTracker:
     """
     Listens to MIDI clock messages and tracks current BPM.
     Computes BPM from inter-clock intervals using a rolling average.
+
+    Clock messages are delivered by the MIDI backend's callback thread, so
+    there is no polling loop.
     """
 
     def __init__(self, clock_port_name: str = "ARIA_CLOCK", window_pulses: int = 96):
@@ -30,16 +33,19 @@ class TempoTracker:
         self.clock_port = None
         self.is_running = False
         self.current_bpm = 120.0  # Default fallback
+        self._mpq = 500_000  # Microseconds per quarter at current_bpm
         
         # Clock tracking
-        self.last_clock_time = None
-        self.clock_intervals = deque(maxlen=window_pulses)
+        self.last_clock_time = None  # time.monotonic_ns() of the last pulse
+        # Pulse times (integer ns) spanning the last window_pulses intervals;
+        # the mean interval is (newest - oldest) / intervals, O(1) per pulse,
+        # exact until the final division and free of running-sum drift
+        self.clock_times = deque(maxlen=window_pulses + 1)
         self.pulse_count = 0
         
-        # Thread control
+        # Callback/consumer synchronization
         self.lock = threading.RLock()
         self.running = False
-        self.thread = None
         
         # Last BPM update time (for throttled logging)
         self.last_bpm_log_time = 0
@@ -51,23 +57,21 @@ class TempoTracker:
         except ImportError:
             raise ImportError("mido is required. Install with: pip install mido")
 
+        self.running = True
         try:
-            self.clock_port = mido.open_input(self._resolve_port_name())
+            self.clock_port = mido.open_input(
+                self._resolve_port_name(), callback=self._on_clock_message
+            )
             logger.info(f"Clock port opened: {self.clock_port_name}")
         except Exception as e:
             logger.error(f"Failed to open clock port '{self.clock_port_name}': {e}")
             logger.info("Listing available input ports: " + ", ".join(mido.get_input_names()))
+            self.running = False
             raise
 
-        self.running = True
-        self.thread = threading.Thread(target=self._clock_loop, daemon=True)
-        self.thread.start()
-
     def stop(self):
         """Stop listening for MIDI clock."""
         self.running = False
-        if self.thread:
-            self.thread.join(timeout=2)
         if self.clock_port:
             self.clock_port.close()
             logger.info("Clock port closed")
@@ -95,16 +99,14 @@ class TempoTracker:
         except Exception:
             return self.clock_port_name
 
-    def _clock_loop(self):
-        """Listen for MIDI clock messages."""
-        logger.info("Clock listening thread started")
+    def _on_clock_message(self, msg):
+        """Backend callback: runs on the MIDI driver's thread per message."""
+        if not self.running:
+            return
         try:
-            while self.running:
-                for msg in self.clock_port.iter_pending():
-                    self._handle_clock_message(msg)
-                time.sleep(0.001)  # Small sleep to avoid busy loop
+            self._handle_clock_message(msg)
         except Exception as e:
-            logger.exception(f"Clock loop error: {e}")
+            logger.exception(f"Clock callback error: {e}")
 
     def _handle_clock_message(self, msg):
         """Process a single MIDI clock message."""
@@ -113,7 +115,7 @@ class TempoTracker:
                 self.is_running = True
                 self.pulse_count = 0
                 self.last_clock_time = None
-                self.clock_intervals.clear()
+                self.clock_times.clear()
                 logger.info("MIDI Clock: START")
 
         elif msg.type == 'continue':
@@ -131,41 +133,41 @@ class TempoTracker:
 
     def _handle_clock_pulse(self):
         """Process a clock pulse and update BPM estimate."""
-        now = time.monotonic()
+        now = time.monotonic_ns()
 
         with self.lock:
+            clock_times = self.clock_times
+            clock_times.append(now)
             if self.last_clock_time is not None:
-                interval = now - self.last_clock_time
-                self.clock_intervals.append(interval)
-
                 # Update BPM from rolling average
-                if len(self.clock_intervals) > 1:
-                    avg_interval = sum(self.clock_intervals) / len(self.clock_intervals)
-                    # avg_interval is seconds per clock pulse
-                    # BPM = 60 / (seconds per beat) = 60 / (avg_interval * 24)
-                    if avg_interval > 0:
-                        self.current_bpm = 60.0 / (avg_interval * PPQN)
+                n_intervals = len(clock_times) - 1
+                if n_intervals > 1:
+                    span_ns = now - clock_times[0]
+                    # Mean seconds per clock pulse = span_ns / n_intervals / 1e9
+                    # BPM = 60 / (seconds per beat) = 60e9 * n / (span_ns * 24)
+                    if span_ns > 0:
+                        self.current_bpm = 60e9 * n_intervals / (span_ns * PPQN)
+                        self._mpq = int(60_000_000 / self.current_bpm)
 
                 # Log BPM updates (throttled)
                 now_time = time.time()
                 if now_time - self.last_bpm_log_time > 1.0:
-                    logger.info(f"BPM: {self.current_bpm:.1f}")
+                    logger.info("BPM: %.1f", self.current_bpm)
                     self.last_bpm_log_time = now_time
 
             self.last_clock_time = now
             self.pulse_count += 1
 
+    # Single-attribute reads are atomic under the GIL and only the clock
+    # callback writes these, so the getters skip the lock
     def get_bpm(self) -> float:
         """Get current BPM estimate."""
-        with self.lock:
-            return self.current_bpm
+        return self.current_bpm
 
     def get_is_running(self) -> bool:
         """Check if MIDI clock is running."""
-        with self.lock:
-            return self.is_running
+        return self.is_running
 
     def get_microseconds_per_beat(self) -> int:
         """Get tempo in microseconds per beat (for MIDI meta messages)."""
-        bpm = self.get_bpm()
-        return int(60_000_000 / bpm)
+        return self._mpq
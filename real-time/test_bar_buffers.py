@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for BarBuffers (ableton_bridge_engine.py).
+Runs without MIDI hardware: python test_bar_buffers.py
+"""
+
+from ableton_bridge_engine import BarBuffers
+
+
+def _size(buffers: BarBuffers) -> int:
+    return len(buffers._lists)
+
+
+def test_append_and_read():
+    """Appended events come back through in, [] and get, per bar."""
+    buffers = BarBuffers(min_bars=8)
+    buffers.append(0, 'a')
+    buffers.append(0, 'b')
+    buffers.append(3, 'c')
+    assert 0 in buffers and 3 in buffers
+    assert 1 not in buffers
+    assert buffers[0] == ['a', 'b']
+    assert buffers.get(3) == ['c']
+    assert buffers.get(1) is None
+    assert buffers.get(1, []) == []
+
+
+def test_min_bars_rounding():
+    """Slot count is the next power of two holding min_bars, at least 8."""
+    for min_bars, size in ((1, 8), (5, 8), (8, 8), (9, 16), (16, 16), (17, 32), (100, 128)):
+        buffers = BarBuffers(min_bars=min_bars)
+        assert _size(buffers) == size, (min_bars, _size(buffers))
+        assert buffers._mask == size - 1
+        # min_bars consecutive bars never evict each other
+        for bar in range(40, 40 + min_bars):
+            buffers.append(bar, bar)
+        assert all(buffers[bar] == [bar] for bar in range(40, 40 + min_bars))
+
+
+def test_slot_reclaim():
+    """Bar + size lands on bar's slot: the old list is cleared in place and reused."""
+    buffers = BarBuffers(min_bars=8)
+    size = _size(buffers)
+    buffers.append(2, 'old-1')
+    buffers.append(2, 'old-2')
+    old_list = buffers[2]
+
+    buffers.append(2 + size, 'new')
+    assert buffers[2 + size] == ['new']
+    assert buffers[2 + size] is old_list  # No new list allocated
+    # Other slots are untouched
+    buffers.append(5, 'x')
+    buffers.append(2 + size, 'new-2')
+    assert buffers[5] == ['x']
+    assert buffers[2 + size] == ['new', 'new-2']
+
+
+def test_reclaimed_bar_misses():
+    """Once its slot is reclaimed, the older bar is gone from every read."""
+    buffers = BarBuffers(min_bars=8)
+    size = _size(buffers)
+    buffers.append(1, 'old')
+    buffers.append(1 + size, 'new')
+    assert 1 not in buffers
+    assert buffers.get(1) is None
+    assert buffers.get(1, 'missing') == 'missing'
+    try:
+        buffers[1]
+    except KeyError as e:
+        assert e.args == (1,)
+    else:
+        raise AssertionError("reclaimed bar did not raise KeyError")
+    # A bar that was never written misses the same way
+    try:
+        buffers[1 + 2 * size]
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("unwritten bar did not raise KeyError")
+
+
+def test_clear():
+    """clear() empties every slot; the buffers keep working afterwards."""
+    buffers = BarBuffers(min_bars=8)
+    for bar in range(_size(buffers)):
+        buffers.append(bar, bar)
+    lists = list(buffers._lists)
+    buffers.clear()
+    assert not any(bar in buffers for bar in range(_size(buffers)))
+    assert buffers.get(0) is None
+    assert all(lst == [] for lst in buffers._lists)
+    assert all(a is b for a, b in zip(buffers._lists, lists))
+    buffers.append(0, 'after')
+    assert buffers[0] == ['after']
+
+
+if __name__ == "__main__":
+    tests = [
+        test_append_and_read,
+        test_min_bars_rounding,
+        test_slot_reclaim,
+        test_reclaimed_bar_misses,
+        test_clear,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✓ All bar buffer tests passed")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Tests for RollingMidiBuffer (midi_buffer.py).
+Runs without MIDI hardware: python test_midi_buffer.py
+"""
+
+import threading
+
+import numpy as np
+
+import midi_buffer
+from midi_buffer import NO_PULSE, RollingMidiBuffer
+
+
+class _FakeClock:
+    """Stands in for the time module inside midi_buffer."""
+
+    def __init__(self, seconds: float = 100.0):
+        self.now_ns = int(seconds * 1e9)
+
+    def set(self, seconds: float) -> None:
+        self.now_ns = int(seconds * 1e9)
+
+    def monotonic_ns(self) -> int:
+        return self.now_ns
+
+    def monotonic(self) -> float:
+        return self.now_ns / 1e9
+
+
+def _with_fake_clock(test):
+    def run():
+        real_time = midi_buffer.time
+        midi_buffer.time = clock = _FakeClock()
+        try:
+            test(clock)
+        finally:
+            midi_buffer.time = real_time
+    run.__name__ = test.__name__
+    return run
+
+
+@_with_fake_clock
+def test_message_roundtrip(clock):
+    """add_message() fields come back from get_messages()."""
+    buf = RollingMidiBuffer(window_seconds=4.0, capacity=16)
+    buf.add_message('note_on', note=60, velocity=90, pulse=5)
+    clock.set(100.5)
+    buf.add_message('note_off', note=60, velocity=0)
+    buf.add_message('control_change', control=64, value=127, pulse=7)
+
+    msgs = buf.get_messages()
+    assert [m.msg_type for m in msgs] == ['note_on', 'note_off', 'control_change']
+    assert (msgs[0].note, msgs[0].velocity, msgs[0].pulse) == (60, 90, 5)
+    assert (msgs[1].note, msgs[1].velocity, msgs[1].pulse) == (60, 0, None)
+    assert (msgs[2].control, msgs[2].value, msgs[2].pulse) == (64, 127, 7)
+    assert msgs[0].timestamp == 100.0 and msgs[1].timestamp == 100.5
+    assert buf.get_arrays()['pulse'].tolist() == [5, NO_PULSE, 7]
+    assert buf.get_duration_seconds() == 0.5
+
+
+@_with_fake_clock
+def test_wraparound_keeps_newest(clock):
+    """Past capacity, the oldest messages are overwritten, order preserved."""
+    buf = RollingMidiBuffer(window_seconds=1000.0, capacity=8)
+    for i in range(21):
+        clock.set(100.0 + i * 0.01)
+        buf.add_raw(0x90, i, 100, i)
+    assert len(buf) == 8
+    cols = buf.get_arrays()
+    # The slot the next write reuses is left out of snapshots
+    assert cols['data1'].tolist() == list(range(14, 21))
+    assert cols['pulse'].tolist() == list(range(14, 21))
+    assert np.all(np.diff(cols['ts_ns']) > 0)
+
+
+@_with_fake_clock
+def test_window_trimming(clock):
+    """Messages older than the window are dropped on add and on read."""
+    buf = RollingMidiBuffer(window_seconds=4.0, capacity=16)
+    for t in (100.0, 101.0, 102.0, 103.0):
+        clock.set(t)
+        buf.add_raw(0x90, int(t) - 100, 100)
+    clock.set(104.5)
+    buf.add_raw(0x90, 4, 100)
+    # Cutoff 100.5: the first message expired when the last was added
+    assert len(buf) == 4
+    assert buf.get_arrays()['data1'].tolist() == [1, 2, 3, 4]
+
+    # No new input: a read still only returns what is inside the window
+    clock.set(106.0)
+    assert buf.get_arrays()['data1'].tolist() == [2, 3, 4]
+    assert buf.get_duration_seconds() == 2.5
+    clock.set(200.0)
+    assert buf.get_messages() == []
+    assert buf.get_duration_seconds() == 0.0
+
+
+@_with_fake_clock
+def test_trim_across_array_end(clock):
+    """Expiry finds the cutoff when the live region wraps around the arrays."""
+    buf = RollingMidiBuffer(window_seconds=1.05, capacity=16)
+    for i in range(20):
+        clock.set(100.0 + i * 0.1)
+        buf.add_raw(0xB0, 64, i)
+    # Cutoff 100.85: messages 9..19 remain, in slots 9..15 then 0..3
+    assert buf.get_arrays()['data2'].tolist() == list(range(9, 20))
+    clock.set(102.0)
+    assert buf.get_arrays()['data2'].tolist() == list(range(10, 20))
+    clock.set(102.6)
+    buf.add_raw(0xB0, 64, 20)
+    # Cutoff 101.55: the whole first run expired, the search continues in
+    # the second one
+    assert len(buf) == 5
+    assert buf.get_arrays()['data2'].tolist() == list(range(16, 21))
+
+
+@_with_fake_clock
+def test_clear(clock):
+    """clear() hides everything added before it, not after."""
+    buf = RollingMidiBuffer(window_seconds=4.0, capacity=8)
+    for i in range(5):
+        buf.add_raw(0x90, i, 100)
+    buf.clear()
+    assert len(buf) == 0
+    assert buf.get_messages() == []
+    buf.add_raw(0x80, 9, 0)
+    assert [m.note for m in buf.get_messages()] == [9]
+
+
+def test_concurrent_add_and_read():
+    """
+    A reader snapshotting while the writer laps a small buffer only ever
+    sees consecutive, untorn rows.
+    """
+    buf = RollingMidiBuffer(window_seconds=60.0, capacity=64)
+    n = 50000
+    done = threading.Event()
+    errors = []
+
+    def writer():
+        for i in range(n):
+            # Every column is derived from i, so a torn row shows up
+            buf.add_raw(0x90, i & 0x7F, (i >> 7) & 0x7F, i)
+        done.set()
+
+    def reader():
+        snapshots = 0
+        while not done.is_set() or snapshots == 0:
+            cols = buf.get_arrays()
+            snapshots += 1
+            pulse = cols['pulse']
+            if len(pulse) == 0:
+                continue
+            if len(pulse) > 64:
+                errors.append(f"snapshot of {len(pulse)} rows > capacity")
+            if not np.all(np.diff(pulse) == 1):
+                errors.append(f"non-consecutive pulses: {pulse.tolist()}")
+            if not np.array_equal(cols['data1'], pulse & 0x7F) or \
+                    not np.array_equal(cols['data2'], (pulse >> 7) & 0x7F):
+                errors.append(f"torn row in snapshot ending at pulse {pulse[-1]}")
+            if not np.all(np.diff(cols['ts_ns']) >= 0):
+                errors.append("timestamps out of order")
+            if errors:
+                return
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30.0)
+    assert not errors, errors[0]
+    assert buf.get_arrays()['pulse'].tolist() == list(range(n - 63, n))
+
+
+if __name__ == "__main__":
+    tests = [
+        test_message_roundtrip,
+        test_wraparound_keeps_newest,
+        test_window_trimming,
+        test_trim_across_array_end,
+        test_clear,
+        test_concurrent_add_and_read,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✓ All midi_buffer tests passed")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for buffer_to_midi_dict (prompt_midi.py) against the original
+scan-based note pairing.
+Runs without MIDI hardware: python test_prompt_midi.py
+"""
+
+import random
+
+from midi_buffer import TimestampedMidiMsg
+from prompt_midi import buffer_to_midi_dict
+
+T0 = 1000.0
+
+
+def _note_msg(start, duration, pitch, velocity):
+    return {
+        'data': {'start': start, 'duration': duration, 'pitch': pitch, 'velocity': velocity},
+        'tick': start,
+    }
+
+
+def _reference_midi_dict(messages):
+    """
+    The pairing buffer_to_midi_dict used before open notes were indexed by
+    pitch: scan the (pitch, velocity) -> start_tick dict for the first open
+    note of the released pitch. Returns (closed, leftover, pedal) lists.
+    """
+    ticks_per_ms = 480 / 500
+    first_timestamp = messages[0].timestamp
+    closed, pedal = [], []
+    active_notes = {}
+    for msg in messages:
+        tick = int((msg.timestamp - first_timestamp) * 1000 * ticks_per_ms)
+        if msg.msg_type == 'note_on' and msg.velocity and msg.velocity > 0:
+            active_notes[(msg.note, msg.velocity)] = tick
+        elif msg.msg_type == 'note_off' or (msg.msg_type == 'note_on' and msg.velocity == 0):
+            for (pitch, velocity), start_tick in list(active_notes.items()):
+                if pitch == msg.note:
+                    closed.append(_note_msg(start_tick, max(1, tick - start_tick), pitch, velocity))
+                    del active_notes[(pitch, velocity)]
+                    break
+        elif msg.msg_type == 'control_change' and msg.control == 64:
+            pedal.append({'tick': tick, 'data': 1 if msg.value and msg.value > 64 else 0})
+    leftover = [_note_msg(t, 1, p, v) for (p, v), t in active_notes.items()]
+    return closed, leftover, pedal
+
+
+def _expected(messages):
+    """Reference output, with held notes in the start-tick order the new code uses."""
+    closed, leftover, pedal = _reference_midi_dict(messages)
+    leftover.sort(key=lambda m: (m['data']['start'], m['data']['pitch'], m['data']['velocity']))
+    return {'note_msgs': closed + leftover, 'pedal_msgs': pedal, 'resolution': 480}
+
+
+def on(t, note, velocity=100):
+    return TimestampedMidiMsg('note_on', note=note, velocity=velocity, timestamp=T0 + t)
+
+
+def off(t, note, as_note_on=False):
+    if as_note_on:
+        return TimestampedMidiMsg('note_on', note=note, velocity=0, timestamp=T0 + t)
+    return TimestampedMidiMsg('note_off', note=note, velocity=0, timestamp=T0 + t)
+
+
+def pedal(t, value):
+    return TimestampedMidiMsg('control_change', control=64, value=value, timestamp=T0 + t)
+
+
+def test_empty():
+    assert buffer_to_midi_dict([]) == {'note_msgs': [], 'pedal_msgs': [], 'resolution': 480}
+
+
+def test_overlapping_notes():
+    """Overlapping notes of one pitch close oldest first, across velocities."""
+    msgs = [
+        on(0.0, 60, 80),
+        on(0.1, 64, 90),
+        on(0.2, 60, 100),   # Second open note on the same pitch
+        off(0.3, 60),       # Closes the velocity-80 note
+        on(0.35, 60, 80),   # Re-opens velocity 80 behind velocity 100
+        off(0.4, 64, as_note_on=True),
+        off(0.5, 60),       # Closes velocity 100
+        off(0.6, 60),       # Closes the re-opened velocity 80
+        off(0.7, 60),       # Nothing left open: ignored
+    ]
+    result = buffer_to_midi_dict(msgs)
+    assert result == _expected(msgs)
+    pairs = [(m['data']['pitch'], m['data']['velocity'], m['data']['start']) for m in result['note_msgs']]
+    assert pairs == [(60, 80, 0), (64, 90, 96), (60, 100, 192), (60, 80, 336)]
+
+
+def test_restruck_note_restarts():
+    """A repeated note_on with the same pitch and velocity restarts that note."""
+    msgs = [on(0.0, 62, 70), on(0.25, 62, 70), off(0.5, 62)]
+    result = buffer_to_midi_dict(msgs)
+    assert result == _expected(msgs)
+    assert result['note_msgs'] == [_note_msg(240, 240, 62, 70)]
+
+
+def test_zero_length_notes():
+    """A note released at its own start tick still lasts one tick."""
+    msgs = [on(0.0, 48), off(0.0, 48), on(0.5, 50), off(0.5004, 50)]
+    result = buffer_to_midi_dict(msgs)
+    assert result == _expected(msgs)
+    assert [m['data']['duration'] for m in result['note_msgs']] == [1, 1]
+
+
+def test_notes_held_at_window_edge():
+    """Notes still down when the window ends become 1-tick notes, by start tick."""
+    msgs = [
+        on(0.0, 72, 60),
+        on(0.1, 40, 90),
+        on(0.2, 55, 75),
+        off(0.3, 40),
+        on(0.4, 40, 95),
+        pedal(0.45, 127),
+    ]
+    result = buffer_to_midi_dict(msgs)
+    assert result == _expected(msgs)
+    held = [m['data']['pitch'] for m in result['note_msgs'][1:]]
+    assert held == [72, 55, 40]
+    assert all(m['data']['duration'] == 1 for m in result['note_msgs'][1:])
+    assert result['pedal_msgs'] == [{'tick': 432, 'data': 1}]
+
+
+def test_pedal_values():
+    msgs = [pedal(0.0, 0), pedal(0.1, 64), pedal(0.2, 65), pedal(0.3, 127)]
+    result = buffer_to_midi_dict(msgs)
+    assert result == _expected(msgs)
+    assert [p['data'] for p in result['pedal_msgs']] == [0, 0, 1, 1]
+
+
+def test_random_buffers_match_reference():
+    """Dense random buffers pair notes exactly like the original scan."""
+    rng = random.Random(1234)
+    for _ in range(500):
+        t = 0.0
+        msgs = []
+        for _ in range(rng.randint(1, 120)):
+            t += rng.choice((0.0, 0.0005, 0.01, 0.05, 0.2))
+            pitch = rng.randint(58, 64)  # Narrow range forces overlaps
+            kind = rng.random()
+            if kind < 0.45:
+                msgs.append(on(t, pitch, rng.choice((1, 64, 100, 127))))
+            elif kind < 0.8:
+                msgs.append(off(t, pitch, as_note_on=rng.random() < 0.3))
+            else:
+                msgs.append(pedal(t, rng.randint(0, 127)))
+        assert buffer_to_midi_dict(msgs) == _expected(msgs)
+
+
+if __name__ == "__main__":
+    tests = [
+        test_empty,
+        test_overlapping_notes,
+        test_restruck_note_restarts,
+        test_zero_length_notes,
+        test_notes_held_at_window_edge,
+        test_pedal_values,
+        test_random_buffers_match_reference,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✓ All prompt_midi tests passed")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for load_pulse_events (ableton_bridge_engine.py).
+Runs without MIDI hardware: python test_pulse_events.py
+"""
+
+import os
+import tempfile
+
+import mido
+
+from ableton_bridge_engine import PULSE_EVENT_DTYPE, load_pulse_events
+
+
+def _two_track_file(ticks_per_beat: int) -> mido.MidiFile:
+    """Piano track plus a pedal track, with messages the loader must skip."""
+    q = ticks_per_beat  # One quarter = 24 pulses
+    mid = mido.MidiFile(ticks_per_beat=ticks_per_beat)
+    piano = mido.MidiTrack()
+    piano.append(mido.MetaMessage('set_tempo', tempo=500000, time=0))
+    piano.append(mido.Message('program_change', program=0, time=0))
+    piano.append(mido.Message('note_on', note=60, velocity=90, time=0))
+    piano.append(mido.Message('note_on', note=64, velocity=80, time=q // 2))
+    piano.append(mido.Message('note_off', note=60, velocity=0, time=q // 2))
+    piano.append(mido.Message('note_on', note=64, velocity=0, channel=1, time=q))
+    piano.append(mido.MetaMessage('end_of_track', time=0))
+    pedal = mido.MidiTrack()
+    pedal.append(mido.Message('control_change', control=64, value=127, time=q))
+    pedal.append(mido.Message('pitchwheel', pitch=100, time=0))
+    pedal.append(mido.Message('control_change', control=64, value=0, time=q // 4))
+    mid.tracks.extend([piano, pedal])
+    return mid
+
+
+# (pulse, status, data1, data2), in the order load_pulse_events returns them
+EXPECTED = [
+    (0, 0x90, 60, 90),
+    (12, 0x90, 64, 80),
+    (24, 0x80, 60, 0),   # Piano track first at pulse 24 (stable merge)
+    (24, 0xB0, 64, 127),
+    (30, 0xB0, 64, 0),
+    (48, 0x91, 64, 0),   # Channel kept in the status byte
+]
+
+
+def _rows(events):
+    return [tuple(int(x) for x in row) for row in events.tolist()]
+
+
+def test_loads_midifile():
+    """Channel messages only, converted to pulses and merged across tracks."""
+    events = load_pulse_events(_two_track_file(480))
+    assert events.dtype == PULSE_EVENT_DTYPE
+    assert _rows(events) == EXPECTED
+
+
+def test_loads_path():
+    """A path gives the same array as the loaded MidiFile."""
+    fd, path = tempfile.mkstemp(suffix='.mid')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            _two_track_file(480).save(file=f)
+        assert _rows(load_pulse_events(path)) == EXPECTED
+    finally:
+        os.unlink(path)
+
+
+def test_resolution_independent():
+    """Pulses depend on beats, not on the file's ticks_per_beat."""
+    for tpb in (96, 192, 960):
+        assert _rows(load_pulse_events(_two_track_file(tpb))) == EXPECTED
+
+
+def test_ticks_floor_to_pulses():
+    """Ticks between pulses round down to the pulse they fall in."""
+    mid = mido.MidiFile(ticks_per_beat=480)  # 20 ticks per pulse
+    track = mido.MidiTrack()
+    for delta in (19, 1, 39, 1):
+        track.append(mido.Message('note_on', note=60, velocity=1, time=delta))
+    mid.tracks.append(track)
+    assert load_pulse_events(mid)['offset'].tolist() == [0, 1, 2, 3]
+
+
+def test_no_channel_messages():
+    mid = mido.MidiFile(ticks_per_beat=480)
+    track = mido.MidiTrack()
+    track.append(mido.MetaMessage('end_of_track', time=0))
+    mid.tracks.append(track)
+    events = load_pulse_events(mid)
+    assert events.dtype == PULSE_EVENT_DTYPE and len(events) == 0
+
+
+if __name__ == "__main__":
+    tests = [
+        test_loads_midifile,
+        test_loads_path,
+        test_resolution_independent,
+        test_ticks_floor_to_pulses,
+        test_no_channel_messages,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✓ All pulse event tests passed")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Tests for the lock-free SPSC rings in ring.py.
+Runs without MIDI hardware: python test_ring.py
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from ring import NO_STAMP, ObjectRing, SpscRing, pack_midi, unpack_midi
+from shm_ring import ShmSpscRing
+
+
+class _HookedSlots:
+    """Slot array that runs a hook just before the producer's next slot write,
+    i.e. between push() reading the head and publishing the tail."""
+
+    def __init__(self, arr):
+        self.arr = arr
+        self.hook = None
+
+    def __getitem__(self, key):
+        return self.arr[key]
+
+    def __setitem__(self, key, value):
+        hook, self.hook = self.hook, None
+        if hook is not None:
+            hook()
+        self.arr[key] = value
+
+
+def test_pack_roundtrip():
+    """Stamps and the three MIDI bytes survive packing."""
+    for stamp in (0, 1, 95, 2**31, NO_STAMP):
+        word = pack_midi(stamp, 0x90, 60, 127)
+        assert unpack_midi(word) == (stamp, 0x90, 60, 127)
+
+
+def test_push_drain():
+    """Records come out in push order, once."""
+    ring = SpscRing(capacity=8)
+    words = [pack_midi(i, 0x90, 60 + i, 100) for i in range(5)]
+    for w in words:
+        assert ring.push(w)
+    assert len(ring) == 5
+    assert ring.drain().tolist() == words
+    assert len(ring) == 0
+    assert ring.drain().tolist() == []
+
+
+def test_wraparound():
+    """Batches that straddle the end of the slot array keep their order."""
+    ring = SpscRing(capacity=8)
+    expected = []
+    got = []
+    for i in range(50):
+        # Uneven batch sizes walk the start index around the array
+        for j in range(i % 7 + 1):
+            w = pack_midi(i, 0x90, j, i & 0x7F)
+            assert ring.push(w)
+            expected.append(w)
+        got.extend(ring.drain().tolist())
+    assert got == expected
+
+
+def test_full_ring_rejects():
+    """A full ring refuses new records and counts them as dropped."""
+    ring = SpscRing(capacity=4)
+    for i in range(4):
+        assert ring.push(i)
+    assert not ring.push(99)
+    assert not ring.push(100)
+    assert ring.dropped == 2
+    assert ring.drain().tolist() == [0, 1, 2, 3]
+    assert ring.push(4)
+    assert ring.drain().tolist() == [4]
+
+
+def test_wake_after_consumer_parks():
+    """
+    The consumer drains and parks in wait() after push() has read the head
+    but before it publishes the tail. The push must still set the event.
+    """
+    ring = SpscRing(capacity=8)
+    ring.push(1)
+    slots = _HookedSlots(ring._buf)
+    ring._buf = slots
+
+    def consumer_drains_and_parks():
+        ring.drain()
+        ring._ready.clear()  # What wait() does before blocking
+
+    slots.hook = consumer_drains_and_parks
+    assert ring.push(2)
+    assert ring._ready.is_set(), "lost wakeup: consumer would sleep until timeout"
+    assert ring.drain().tolist() == [2]
+
+
+def test_blocked_consumer_wakes():
+    """A consumer blocked in wait() returns as soon as a record is pushed."""
+    ring = SpscRing(capacity=8)
+    woke = []
+
+    def consumer():
+        t0 = time.monotonic()
+        ok = ring.wait(timeout=5.0)
+        woke.append((ok, time.monotonic() - t0))
+
+    thread = threading.Thread(target=consumer)
+    thread.start()
+    time.sleep(0.05)
+    ring.push(pack_midi(0, 0x90, 60, 100))
+    thread.join(timeout=5.0)
+    ok, waited = woke[0]
+    assert ok and waited < 1.0
+
+
+def test_threaded_stream():
+    """Everything a producer thread pushes reaches a waiting consumer, in order."""
+    ring = SpscRing(capacity=64)
+    n = 20000
+    received = []
+
+    def producer():
+        i = 0
+        while i < n:
+            if ring.push(i):
+                i += 1
+            else:
+                time.sleep(0)
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    deadline = time.monotonic() + 10.0
+    while len(received) < n and time.monotonic() < deadline:
+        if ring.wait(timeout=0.1):
+            received.extend(ring.drain().tolist())
+    thread.join(timeout=5.0)
+    assert received == list(range(n))
+    assert np.all(np.diff(received) == 1)
+
+
+def test_object_ring_fifo_and_full():
+    """ObjectRing pops in push order, rejects when full and frees popped slots."""
+    ring = ObjectRing(capacity=4)
+    items = [("job", i) for i in range(4)]
+    for item in items:
+        assert ring.push(item)
+    assert not ring.push(("job", 99))
+    assert ring.dropped == 1
+    for item in items:
+        assert ring.pop() is item
+    assert ring.pop() is None
+    assert all(slot is None for slot in ring._slots)
+    # Wrap the indices around a few times
+    for i in range(10):
+        assert ring.push(i)
+        assert ring.pop() == i
+
+
+def test_object_ring_wake_after_consumer_parks():
+    """Same lost-wakeup interleaving as the SpscRing test, on ObjectRing."""
+    ring = ObjectRing(capacity=8)
+    ring.push("first")
+    slots = _HookedSlots(ring._slots)
+    ring._slots = slots
+
+    def consumer_drains_and_parks():
+        while ring.pop() is not None:
+            pass
+        ring._ready.clear()
+
+    slots.hook = consumer_drains_and_parks
+    assert ring.push("second")
+    assert ring._ready.is_set(), "lost wakeup: consumer would sleep until timeout"
+    assert ring.pop() == "second"
+
+
+def test_shm_ring_push_drain_and_wake():
+    """ShmSpscRing keeps order across wraparound and signals on every push."""
+    ring = ShmSpscRing(capacity=8)
+    try:
+        expected = []
+        got = []
+        for i in range(20):
+            for j in range(i % 5 + 1):
+                w = pack_midi(i, 0xB0, 64, j)
+                ring.ready.clear()
+                assert ring.push(w)
+                assert ring.ready.is_set()
+                expected.append(w)
+            got.extend(ring.drain().tolist())
+        assert got == expected
+        for i in range(8):
+            assert ring.push(i)
+        assert not ring.push(8)
+        assert ring.dropped == 1
+        assert ring.drain().tolist() == list(range(8))
+    finally:
+        ring.close()
+
+
+if __name__ == "__main__":
+    tests = [
+        test_pack_roundtrip,
+        test_push_drain,
+        test_wraparound,
+        test_full_ring_rejects,
+        test_wake_after_consumer_parks,
+        test_blocked_consumer_wakes,
+        test_threaded_stream,
+        test_object_ring_fifo_and_full,
+        test_object_ring_wake_after_consumer_parks,
+        test_shm_ring_push_drain_and_wake,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✓ All ring tests passed")
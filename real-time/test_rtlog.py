@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the deferred binary log ring in rtlog.py.
+Runs without MIDI hardware: python test_rtlog.py
+"""
+
+import logging
+import threading
+import time
+
+import rtlog
+from rtlog import RtLog
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _capture(name: str, level: int = logging.DEBUG):
+    logger = logging.getLogger(f"test_rtlog.{name}")
+    logger.setLevel(level)
+    logger.propagate = False
+    handler = _ListHandler()
+    logger.handlers = [handler]
+    return logger, handler
+
+
+def test_push_flush_format():
+    """Records come out formatted, in order, with their push-time timestamps."""
+    logger, handler = _capture("format")
+    code = rtlog.define(logger, logging.INFO, "note pitch=%d vel=%d")
+    log = RtLog(capacity=16)
+    before = time.time()
+    log.push(code, 60, 100)
+    log.push(code, 62, -1)
+    after = time.time()
+    time.sleep(0.2)
+    assert log.flush() == 2
+    assert [r.getMessage() for r in handler.records] == ["note pitch=60 vel=100", "note pitch=62 vel=-1"]
+    # Stamped when pushed, not when flushed
+    assert all(before - 0.01 <= r.created <= after + 0.01 for r in handler.records)
+    assert log.flush() == 0
+
+
+def test_level_filtered_at_push():
+    """Messages below the logger's level never take a slot."""
+    logger, handler = _capture("level", level=logging.INFO)
+    debug_code = rtlog.define(logger, logging.DEBUG, "debug %d")
+    info_code = rtlog.define(logger, logging.INFO, "info %d")
+    log = RtLog(capacity=4)
+    for i in range(10):
+        log.push(debug_code, i)
+    log.push(info_code, 1)
+    assert log.flush() == 1
+    assert log.dropped == 0
+    assert [r.getMessage() for r in handler.records] == ["info 1"]
+
+    # Raised above a record's level after it was pushed: filtered at flush
+    log.push(info_code, 2)
+    logger.setLevel(logging.WARNING)
+    log.flush()
+    assert [r.getMessage() for r in handler.records] == ["info 1"]
+
+
+def test_overflow_keeps_newest():
+    """Producers lapping the flusher lose the oldest records, counted."""
+    logger, handler = _capture("overflow")
+    code = rtlog.define(logger, logging.INFO, "seq %d")
+    log = RtLog(capacity=8)
+    for i in range(20):
+        log.push(code, i)
+    assert log.flush() == 8
+    assert log.dropped == 12
+    assert [r.args[0] for r in handler.records] == list(range(12, 20))
+    # The ring keeps working after the lap
+    log.push(code, 20)
+    assert log.flush() == 1 and handler.records[-1].args == (20,)
+
+
+def test_concurrent_producers():
+    """Several threads pushing while the flusher runs: nothing lost or reordered."""
+    logger, handler = _capture("concurrent")
+    code = rtlog.define(logger, logging.INFO, "producer %d seq %d")
+    n_threads, n_each = 4, 3000
+    log = RtLog(capacity=1 << 15, flush_interval=0.005)
+    log.start()
+    go = threading.Event()
+
+    def producer(tid):
+        go.wait()
+        for i in range(n_each):
+            log.push(code, tid, i)
+
+    threads = [threading.Thread(target=producer, args=(t,)) for t in range(n_threads)]
+    for t in threads:
+        t.start()
+    go.set()
+    for t in threads:
+        t.join()
+    log.stop()
+
+    assert log.dropped == 0
+    assert len(handler.records) == n_threads * n_each
+    by_thread = {t: [] for t in range(n_threads)}
+    for r in handler.records:
+        tid, seq = r.args
+        by_thread[tid].append(seq)
+    for seqs in by_thread.values():
+        assert seqs == list(range(n_each))
+
+
+def test_stop_flushes_remaining():
+    """stop() returns promptly and flushes what the flusher had not reached."""
+    logger, handler = _capture("stop")
+    code = rtlog.define(logger, logging.INFO, "left %d")
+    log = RtLog(capacity=64, flush_interval=10.0)
+    log.start()
+    for i in range(5):
+        log.push(code, i)
+    t0 = time.monotonic()
+    log.stop()
+    assert time.monotonic() - t0 < 1.0
+    assert [r.args[0] for r in handler.records] == list(range(5))
+    assert log._thread is None
+    # Restartable
+    log.start()
+    log.push(code, 5)
+    log.stop()
+    assert handler.records[-1].args == (5,)
+
+
+if __name__ == "__main__":
+    tests = [
+        test_push_flush_format,
+        test_level_filtered_at_push,
+        test_overflow_keeps_newest,
+        test_concurrent_producers,
+        test_stop_flushes_remaining,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✓ All rtlog tests passed")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests for the model-output scheduler in ableton_bridge_engine.py:
+_schedule_two_bar_response() feeding _service_scheduled_messages() through
+the (replace, entries) intake.
+Runs without MIDI hardware: python test_scheduler.py
+"""
+
+import itertools
+import queue
+
+import numpy as np
+
+from ableton_bridge_engine import (
+    CONTROL_CHANGE,
+    NOTE_OFF,
+    NOTE_ON,
+    PULSE_EVENT_DTYPE,
+    AbletonBridge,
+    BarBuffers,
+)
+
+PULSES_PER_BAR = 96  # 4/4 at 24 PPQN
+CC123 = (CONTROL_CHANGE, 123, 0)
+
+
+class _RecordingPort:
+    """Output port that records each send_message() with the pulse it happened at."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = []
+
+    def send_message(self, raw):
+        self.sent.append((self.clock.pulse, tuple(raw)))
+
+
+class _StubClock:
+    """Stands in for the ClockGrid; the test sets the current pulse."""
+
+    def __init__(self, pulse: int = 0):
+        self.pulse = pulse
+
+    def get_pulse_count(self) -> int:
+        return self.pulse
+
+
+def _bridge(gen_measures: int = 2) -> AbletonBridge:
+    """Just the state the scheduler touches, without opening any ports."""
+    bridge = object.__new__(AbletonBridge)
+    bridge.gen_measures = gen_measures
+    bridge.PHASE_HUMAN = 'human'
+    bridge.PHASE_AI_PLAY = 'ai_play'
+    bridge.phase = bridge.PHASE_AI_PLAY
+    bridge.scheduled_heap = []
+    bridge._schedule_seq = itertools.count()
+    bridge._schedule_intake = queue.SimpleQueue()
+    bridge.model_end_pulse = None
+    bridge.human_bar_buffers = BarBuffers()
+    bridge.human_activity = False
+    bridge.bars_collected_in_phase = 0
+    bridge.clock_grid = _StubClock()
+    bridge.out_port = _RecordingPort(bridge.clock_grid)
+    return bridge
+
+
+def _events(rows):
+    return np.array(rows, dtype=PULSE_EVENT_DTYPE)
+
+
+def _run(bridge, start: int, stop: int) -> None:
+    """Service the scheduler once per pulse over [start, stop)."""
+    for pulse in range(start, stop):
+        bridge.clock_grid.pulse = pulse
+        bridge._service_scheduled_messages()
+
+
+def test_due_messages_in_pulse_seq_order():
+    """Messages go out at their target pulse, ties in insertion order, once each."""
+    bridge = _bridge()
+    events = _events([
+        (0, NOTE_ON, 64, 90),
+        (0, NOTE_ON, 60, 80),    # Same pulse: sent after pitch 64
+        (24, NOTE_OFF, 60, 0),
+        (48, CONTROL_CHANGE, 64, 127),
+        (48, NOTE_ON, 64, 0),    # note_on with velocity 0 closes pitch 64
+        (100, CONTROL_CHANGE, 64, 0),
+    ])
+    bridge._schedule_two_bar_response(events, boundary_pulse=1000, pulses_per_bar=PULSES_PER_BAR)
+    assert bridge.model_end_pulse == 1000 + 2 * PULSES_PER_BAR
+
+    # Nothing is due before the boundary
+    _run(bridge, 990, 1000)
+    assert bridge.out_port.sent == []
+
+    # Servicing the same pulse again sends nothing new
+    _run(bridge, 1000, 1001)
+    _run(bridge, 1000, 1001)
+    assert bridge.out_port.sent == [(1000, (NOTE_ON, 64, 90)), (1000, (NOTE_ON, 60, 80))]
+
+    _run(bridge, 1001, 1300)
+    assert bridge.out_port.sent == [
+        (1000, (NOTE_ON, 64, 90)),
+        (1000, (NOTE_ON, 60, 80)),
+        (1024, (NOTE_OFF, 60, 0)),
+        (1048, (CONTROL_CHANGE, 64, 127)),
+        (1048, (NOTE_ON, 64, 0)),
+        (1100, (CONTROL_CHANGE, 64, 0)),
+        (1192, CC123),
+    ]
+    assert bridge.scheduled_heap == []
+    assert bridge.phase == bridge.PHASE_HUMAN and bridge.model_end_pulse is None
+
+
+def test_late_service_sends_backlog_once():
+    """A service call that falls behind sends every overdue message, in order, once."""
+    bridge = _bridge()
+    events = _events([(0, NOTE_ON, 60, 80), (12, NOTE_OFF, 60, 0), (30, NOTE_ON, 62, 70)])
+    bridge._schedule_two_bar_response(events, boundary_pulse=0, pulses_per_bar=PULSES_PER_BAR)
+    _run(bridge, 20, 21)
+    assert [raw for _, raw in bridge.out_port.sent] == [(NOTE_ON, 60, 80), (NOTE_OFF, 60, 0)]
+    _run(bridge, 20, 200)
+    assert [raw for _, raw in bridge.out_port.sent] == [
+        (NOTE_ON, 60, 80), (NOTE_OFF, 60, 0), (NOTE_ON, 62, 70), (NOTE_OFF, 62, 0), CC123,
+    ]
+
+
+def test_replace_discards_old_heap():
+    """A new response replaces whatever is still queued from the previous one."""
+    bridge = _bridge()
+    first = _events([(0, NOTE_ON, 60, 80), (10, NOTE_OFF, 60, 0), (50, NOTE_ON, 61, 80), (90, NOTE_OFF, 61, 0)])
+    bridge._schedule_two_bar_response(first, boundary_pulse=0, pulses_per_bar=PULSES_PER_BAR)
+    _run(bridge, 0, 20)
+    assert [raw for _, raw in bridge.out_port.sent] == [(NOTE_ON, 60, 80), (NOTE_OFF, 60, 0)]
+
+    second = _events([(0, NOTE_ON, 70, 90), (5, NOTE_OFF, 70, 0)])
+    bridge._schedule_two_bar_response(second, boundary_pulse=30, pulses_per_bar=PULSES_PER_BAR)
+    _run(bridge, 20, 300)
+    assert bridge.out_port.sent[2:] == [
+        (30, (NOTE_ON, 70, 90)),
+        (35, (NOTE_OFF, 70, 0)),
+        (30 + 2 * PULSES_PER_BAR, CC123),
+    ]
+    sent_pitches = {raw[1] for _, raw in bridge.out_port.sent}
+    assert 61 not in sent_pitches
+
+
+def test_events_past_limit_dropped():
+    """Events at or past gen_measures * pulses_per_bar never reach the port."""
+    bridge = _bridge(gen_measures=1)
+    limit = PULSES_PER_BAR
+    events = _events([
+        (0, NOTE_ON, 60, 80),
+        (limit - 1, NOTE_OFF, 60, 0),
+        (limit, NOTE_ON, 65, 80),        # At the limit: dropped, no forced note-off
+        (limit + 40, NOTE_OFF, 60, 0),
+    ])
+    bridge._schedule_two_bar_response(events, boundary_pulse=500, pulses_per_bar=PULSES_PER_BAR)
+    assert bridge.model_end_pulse == 500 + limit
+    _run(bridge, 500, 800)
+    assert bridge.out_port.sent == [
+        (500, (NOTE_ON, 60, 80)),
+        (500 + limit - 1, (NOTE_OFF, 60, 0)),
+        (500 + limit, CC123),
+    ]
+
+
+def test_unclosed_notes_forced_off_before_cc123():
+    """Pitches still sounding at the end get a NOTE_OFF at end_pulse, then CC123."""
+    bridge = _bridge()
+    events = _events([
+        (0, NOTE_ON, 72, 80),
+        (0, NOTE_ON, 48, 80),
+        (10, NOTE_ON, 60, 80),
+        (20, NOTE_OFF, 60, 0),
+        (30, NOTE_ON, 60, 90),   # Re-struck and left open
+        (40, NOTE_ON, 55, 80),
+        (50, NOTE_ON, 55, 0),
+    ])
+    bridge._schedule_two_bar_response(events, boundary_pulse=0, pulses_per_bar=PULSES_PER_BAR)
+    end_pulse = 2 * PULSES_PER_BAR
+    _run(bridge, 0, end_pulse + 10)
+    at_end = [raw for pulse, raw in bridge.out_port.sent if pulse == end_pulse]
+    assert at_end == [(NOTE_OFF, 48, 0), (NOTE_OFF, 60, 0), (NOTE_OFF, 72, 0), CC123]
+    assert len(bridge.out_port.sent) == len(events) + len(at_end)
+
+
+if __name__ == "__main__":
+    tests = [
+        test_due_messages_in_pulse_seq_order,
+        test_late_service_sends_backlog_once,
+        test_replace_discards_old_heap,
+        test_events_past_limit_dropped,
+        test_unclosed_notes_forced_off_before_cc123,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✓ All scheduler tests passed")